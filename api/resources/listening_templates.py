@@ -1,6 +1,7 @@
 import json
 from flask import request
 from flask_restful import Resource
+from psycopg2.errors import UniqueViolation
 from utils.db_connector import get_db_connection
 from api.auth import token_required, admin_required
 from api.utils import success_response, error_response, parse_json_field
@@ -72,6 +73,9 @@ class ListeningTemplateResource(Resource):
                     conn.commit()
                     
                     return success_response({'id': template_id}, "Listening template updated successfully")
+            except UniqueViolation:
+                conn.rollback()
+                return error_response(f"A template named '{data.get('name')}' already exists", 409)
             except Exception as e:
                 conn.rollback()
                 return error_response(f"Error updating listening template: {str(e)}", 500)
@@ -212,6 +216,9 @@ class ListeningTemplateListResource(Resource):
                     conn.commit()
                     
                     return success_response({'id': result[0]}, "Listening template created successfully", 201)
+            except UniqueViolation:
+                conn.rollback()
+                return error_response(f"A template named '{data.get('name')}' already exists", 409)
             except Exception as e:
                 conn.rollback()
                 return error_response(f"Error creating listening template: {str(e)}", 500)
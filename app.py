@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
 import os
-import threading
-from utils.database import initialize_db, get_patients
-from utils.db_connector import test_database_connection, initialize_database
+import socket
+import time
+from utils.database import ensure_db_initialized, use_database, get_dashboard_summary, get_patients_version
 
-# Initialize Flask API in a separate thread
-from api import api_app
+# The REST API runs in its own gunicorn process (see Procfile)
+API_HOST = "127.0.0.1"
+API_PORT = 8000
 
 # Page configuration
 st.set_page_config(
@@ -16,25 +18,68 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Start the API server in a separate thread
-def run_api_server():
-    api_app.run(host='0.0.0.0', port=8000, debug=False, threaded=True)
+@st.cache_data(ttl=60, show_spinner=False)
+def ensure_api_reachable(retries=3, delay=0.5):
+    """Check that the API server is accepting connections"""
+    for attempt in range(retries):
+        try:
+            with socket.create_connection((API_HOST, API_PORT), timeout=1):
+                return True
+        except OSError:
+            if attempt < retries - 1:
+                time.sleep(delay)
+    return False
 
-# Start the API server if it hasn't been started yet
-if 'api_started' not in st.session_state:
-    api_thread = threading.Thread(target=run_api_server, daemon=True)
-    api_thread.start()
-    st.session_state.api_started = True
-
-# Initialize database
+# Initialize database once per process
 # First try PostgreSQL database, then fall back to file storage if needed
-if 'db_initialized' not in st.session_state:
-    connection_ok, _ = test_database_connection()
-    if connection_ok:
-        st.session_state.db_initialized = initialize_database()
+ensure_db_initialized()
+
+@st.cache_data(ttl=60)
+def load_dashboard_summary(patients_version):
+    """Load the dashboard counts and recent patients in a single query"""
+    return get_dashboard_summary()
+
+@st.cache_data(ttl=60)
+def get_recent_patients_arrow(patients_version, _recent_patients):
+    """Build the Recent Patients table as Arrow IPC bytes, cached per patient list version"""
+    # Create a dataframe for display
+    recent_df = pd.DataFrame({
+        "ID": [p.get('id', '') for p in _recent_patients],
+        "Name": [p.get('name', '') for p in _recent_patients],
+        "Age": [p.get('age') for p in _recent_patients],
+        "Last Updated": [p.get('last_updated', '') for p in _recent_patients],
+        "Status": ["Complete" if p.get('assessment_complete', False) else "In Progress" for p in _recent_patients]
+    }).astype({"Name": "string[pyarrow]", "Status": "string[pyarrow]"})
+    
+    # Serialize once so reruns skip the pandas -> Arrow conversion
+    table = pa.Table.from_pandas(recent_df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def render_patient_stats(summary):
+    """Display the patient count metrics"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Patients", summary.total)
+    with col2:
+        # Count patients that need referral (if referral_needed column exists and is True)
+        st.metric("Referrals Needed", summary.referrals_needed)
+    with col3:
+        # Count completed assessments (if assessment_complete column exists and is True)
+        st.metric("Completed Assessments", summary.completed)
+
+def render_recent_patients(summary, patients_version):
+    """Display the most recently updated patients"""
+    st.subheader("Recent Patients")
+    if summary.recent:
+        # Only rebuild the table when the patient list has changed
+        recent_table = pa.ipc.open_stream(get_recent_patients_arrow(patients_version, summary.recent)).read_all()
+        
+        st.dataframe(recent_table, use_container_width=True)
     else:
-        st.session_state.db_initialized = False
-        initialize_db()  # Initialize file storage as fallback
+        st.info("No patients in the database yet. Start by creating a new patient assessment.")
 
 def main():
     # Sidebar for navigation
@@ -55,20 +100,10 @@ def main():
     Use the sidebar navigation or click on the buttons below to access different modules.
     """)
     
-    # Display stats
-    patients = get_patients()
-    
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Total Patients", len(patients))
-    with col2:
-        # Count patients that need referral (if referral_needed column exists and is True)
-        referrals_needed = sum(1 for p in patients if p.get('referral_needed', False))
-        st.metric("Referrals Needed", referrals_needed)
-    with col3:
-        # Count completed assessments (if assessment_complete column exists and is True)
-        completed = sum(1 for p in patients if p.get('assessment_complete', False))
-        st.metric("Completed Assessments", completed)
+    # Display stats; the summary and the recent table share one patients version
+    patients_version = get_patients_version()
+    summary = load_dashboard_summary(patients_version)
+    render_patient_stats(summary)
     
     # Quick action buttons
     st.subheader("Quick Actions")
@@ -86,15 +121,17 @@ def main():
         if st.button("Database Admin", use_container_width=True):
             st.switch_page("pages/6_Database_Admin.py")
     
-    # Database connection status
-    connection_ok, _ = test_database_connection()
-    if connection_ok:
+    # Storage backend status
+    if use_database():
         st.success("✅ Using PostgreSQL Database")
     else:
         st.warning("⚠️ Using file-based storage (PostgreSQL connection unavailable)")
     
     # API Information
     with st.expander("API Access Information"):
+        if not ensure_api_reachable():
+            st.warning(f"⚠️ The API server is not reachable on port {API_PORT}. Start it with the `api` process in the Procfile.")
+        
         st.markdown("""
         ### REST API
         
@@ -134,25 +171,7 @@ def main():
         """)
     
     # Recent patients
-    st.subheader("Recent Patients")
-    if patients:
-        # Display the 5 most recent patients
-        recent_patients = sorted(patients, key=lambda x: x.get('last_updated', ''), reverse=True)[:5]
-        
-        # Create a dataframe for display
-        recent_df = pd.DataFrame([
-            {
-                "ID": p.get('id', ''),
-                "Name": p.get('name', ''),
-                "Age": p.get('age', ''),
-                "Last Updated": p.get('last_updated', ''),
-                "Status": "Complete" if p.get('assessment_complete', False) else "In Progress"
-            } for p in recent_patients
-        ])
-        
-        st.dataframe(recent_df, use_container_width=True)
-    else:
-        st.info("No patients in the database yet. Start by creating a new patient assessment.")
+    render_recent_patients(summary, patients_version)
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
-import json
-from utils.db_connector import get_db_connection, test_database_connection
+import orjson
+from psycopg2.errors import UniqueViolation
+from psycopg2.extras import execute_values
+from utils.db_connector import db_connection, prepare_statements, test_database_connection, to_jsonb
+from utils.listening_templates import DEFAULT_LISTENING_TEMPLATES
 
 st.set_page_config(
     page_title="Listening Module Management - PFA Counseling",
@@ -9,50 +12,142 @@ st.set_page_config(
     layout="wide"
 )
 
-def get_all_listening_templates():
-    """Get all listening templates from the database"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute("SELECT * FROM listening_templates ORDER BY name ASC")
-                columns = [desc[0] for desc in cur.description]
-                result = cur.fetchall()
-                
-                # Convert to list of dictionaries
-                templates = []
-                for row in result:
-                    template_dict = dict(zip(columns, row))
-                    
-                    # Parse JSONB fields
-                    if 'questions' in template_dict and template_dict['questions']:
-                        template_dict['questions'] = json.loads(template_dict['questions'])
-                        
-                    templates.append(template_dict)
-                
-                return templates
-        except Exception as e:
-            st.error(f"Error retrieving listening templates: {e}")
-        finally:
-            conn.close()
-    return []
+# Upper bound on the questions JSON accepted from the add/edit forms
+MAX_TEMPLATE_BYTES = 256 * 1024
+
+# Rows per page of the View table
+TEMPLATES_PAGE_SIZE = 50
+
+# Hot statements, prepared once per pooled connection and then EXECUTEd
+LISTENING_TEMPLATE_STATEMENTS = {
+    'lt_list': """
+        SELECT id, name,
+               CASE WHEN jsonb_typeof(questions) = 'array'
+                    THEN jsonb_array_length(questions) ELSE 0 END AS question_count,
+               updated_at
+        FROM listening_templates
+        WHERE $1::varchar IS NULL OR (name, id) > ($1::varchar, $2::integer)
+        ORDER BY name ASC, id ASC
+        LIMIT $3::integer
+    """,
+    'lt_get': """
+        SELECT id, name, description, questions, created_at, updated_at
+        FROM listening_templates
+        WHERE id = $1::integer
+    """,
+    'lt_ins': """
+        INSERT INTO listening_templates (name, description, questions, guidelines)
+        VALUES ($1::varchar, $2::text, $3::jsonb, $4::text)
+        RETURNING id
+    """,
+    'lt_upd': """
+        UPDATE listening_templates
+        SET name = $1::varchar, description = $2::text, questions = $3::jsonb, guidelines = $4::text
+        WHERE id = $5::integer
+        RETURNING id
+    """,
+    'lt_del': "DELETE FROM listening_templates WHERE id = $1::integer",
+}
+
+# Cached reads raise on database errors, so a failure is never cached; callers go through read_templates
+
+@st.cache_data(ttl=300, show_spinner=False)
+def list_listening_templates(after=None, limit=None):
+    """Get id, name, question count and update time of the templates sorted after the (name, id) cursor"""
+    with db_connection() as conn:
+        prepare_statements(conn, LISTENING_TEMPLATE_STATEMENTS)
+        with conn.cursor() as cur:
+            # Count questions server-side instead of shipping the JSONB and guidelines
+            after_name, after_id = after or (None, None)
+            cur.execute("EXECUTE lt_list (%s, %s, %s)", (after_name, after_id, limit))
+            columns = [desc[0] for desc in cur.description]
+            result = cur.fetchall()
+            
+            # Convert to list of dictionaries
+            return [dict(zip(columns, row)) for row in result]
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_listening_template(template_id):
+    """Get a single listening template with its questions (guidelines are loaded separately)"""
+    with db_connection() as conn:
+        prepare_statements(conn, LISTENING_TEMPLATE_STATEMENTS)
+        with conn.cursor() as cur:
+            cur.execute("EXECUTE lt_get (%s)", (template_id,))
+            columns = [desc[0] for desc in cur.description]
+            result = cur.fetchone()
+            
+            # psycopg2 already decodes JSONB fields
+            return dict(zip(columns, result)) if result else None
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_template_guidelines(template_id):
+    """Get the guidelines markdown of a single listening template"""
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT guidelines FROM listening_templates WHERE id = %s", (template_id,))
+            result = cur.fetchone()
+            return result[0] if result else None
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_template_index():
+    """(id, name, question_count) of every listening template, as stable selectbox options"""
+    return tuple((t['id'], t['name'], t['question_count']) for t in list_listening_templates())
+
+def read_templates(loader, *args, default=None):
+    """Call a cached template read; database errors are raised (so never cached) and reported here"""
+    try:
+        return loader(*args)
+    except Exception as e:
+        st.error(f"Error retrieving listening templates: {e}")
+        return default
+
+def clear_listening_template_cache():
+    """Invalidate cached template reads after a write"""
+    list_listening_templates.clear()
+    get_template_index.clear()
+    get_listening_template.clear()
+    get_template_guidelines.clear()
+    group_questions_by_category.clear()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def group_questions_by_category(template_key, _questions):
+    """Group a template's questions by category, memoized on (template id, updated_at)"""
+    questions_by_category = {}
+    for q in _questions:
+        if isinstance(q, dict):
+            questions_by_category.setdefault(q.get('category', 'General'), []).append(q)
+    return questions_by_category
+
+def format_questions_markdown(questions_by_category):
+    """Render grouped questions as one markdown document"""
+    lines = []
+    for category, category_questions in questions_by_category.items():
+        lines.append(f"### {category}")
+        for i, q in enumerate(category_questions, 1):
+            lines.append(f"{i}. {q.get('question', '')}")
+            lines.append(f"   *Type: {q.get('type', 'text')}*")
+            
+            if q.get('type') == 'select' and 'options' in q:
+                lines.append("   Options:")
+                for opt in q['options']:
+                    lines.append(f"   - {opt}")
+            
+            if q.get('required', False):
+                lines.append("   *Required*")
+            lines.append("")
+    return "\n".join(lines)
 
 def save_listening_template(template_data, template_id=None):
     """Save or update a listening template in the database"""
-    conn = get_db_connection()
-    if conn:
-        try:
+    try:
+        with db_connection() as conn:
+            prepare_statements(conn, LISTENING_TEMPLATE_STATEMENTS)
             with conn.cursor() as cur:
                 # Prepare JSON fields
-                questions = json.dumps(template_data.get('questions', []))
+                questions = to_jsonb(template_data.get('questions', []))
                 
                 if template_id:  # Update existing
-                    cur.execute("""
-                        UPDATE listening_templates 
-                        SET name = %s, description = %s, questions = %s, guidelines = %s
-                        WHERE id = %s
-                        RETURNING id
-                    """, (
+                    cur.execute("EXECUTE lt_upd (%s, %s, %s, %s, %s)", (
                         template_data['name'],
                         template_data['description'],
                         questions,
@@ -60,12 +155,7 @@ def save_listening_template(template_data, template_id=None):
                         template_id
                     ))
                 else:  # Insert new
-                    cur.execute("""
-                        INSERT INTO listening_templates 
-                        (name, description, questions, guidelines)
-                        VALUES (%s, %s, %s, %s)
-                        RETURNING id
-                    """, (
+                    cur.execute("EXECUTE lt_ins (%s, %s, %s, %s)", (
                         template_data['name'],
                         template_data['description'],
                         questions,
@@ -74,288 +164,70 @@ def save_listening_template(template_data, template_id=None):
                 
                 result = cur.fetchone()
                 conn.commit()
+                clear_listening_template_cache()
                 return result[0] if result else None
-        except Exception as e:
-            st.error(f"Error saving listening template: {e}")
-        finally:
-            conn.close()
+    except UniqueViolation:
+        # Template names are unique (idx_listening_templates_name)
+        st.error(f"A template named '{template_data['name']}' already exists")
+    except Exception as e:
+        st.error(f"Error saving listening template: {e}")
+    return None
+
+def save_listening_templates_bulk(templates):
+    """Insert several listening templates in a single statement, skipping names already present; returns the new IDs (None on error)"""
+    try:
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                rows = [
+                    (t['name'], t['description'], to_jsonb(t.get('questions', [])), t['guidelines'])
+                    for t in templates
+                ]
+                result = execute_values(cur, """
+                    INSERT INTO listening_templates 
+                    (name, description, questions, guidelines)
+                    VALUES %s
+                    ON CONFLICT (name) DO NOTHING
+                    RETURNING id
+                """, rows, fetch=True)
+                conn.commit()
+                clear_listening_template_cache()
+                return [row[0] for row in result]
+    except Exception as e:
+        st.error(f"Error saving listening templates: {e}")
     return None
 
 def delete_listening_template(template_id):
     """Delete a listening template from the database"""
-    conn = get_db_connection()
-    if conn:
-        try:
+    try:
+        with db_connection() as conn:
+            prepare_statements(conn, LISTENING_TEMPLATE_STATEMENTS)
             with conn.cursor() as cur:
-                cur.execute("DELETE FROM listening_templates WHERE id = %s", (template_id,))
+                cur.execute("EXECUTE lt_del (%s)", (template_id,))
                 conn.commit()
+                clear_listening_template_cache()
                 return True, "Listening template deleted successfully"
-        except Exception as e:
-            st.error(f"Error deleting listening template: {e}")
-            return False, f"Error: {e}"
-        finally:
-            conn.close()
-    return False, "Database connection failed"
+    except Exception as e:
+        st.error(f"Error deleting listening template: {e}")
+        return False, f"Error: {e}"
 
 def import_default_templates():
-    """Import default listening templates to the database"""
-    # Standard PFA Listening Template
-    pfa_listening = {
-        'name': 'Standard PFA Listening Session',
-        'description': 'A structured approach to psychological first aid listening sessions based on WHO guidelines.',
-        'questions': [
-            {
-                'category': 'Presenting Problems',
-                'question': 'What brings you here today?',
-                'type': 'text',
-                'required': True
-            },
-            {
-                'category': 'Presenting Problems',
-                'question': 'When did you first notice these concerns?',
-                'type': 'text',
-                'required': False
-            },
-            {
-                'category': 'Narrative',
-                'question': 'Can you tell me more about your experience?',
-                'type': 'textarea',
-                'required': True
-            },
-            {
-                'category': 'Emotional State',
-                'question': 'What emotions are you experiencing now?',
-                'type': 'select',
-                'options': [
-                    'Sadness', 'Anxiety', 'Fear', 'Anger', 'Helplessness', 
-                    'Hopelessness', 'Guilt', 'Shame', 'Numbness', 'Other'
-                ],
-                'required': True
-            },
-            {
-                'category': 'Emotional State',
-                'question': 'How intense are these emotions (1-10 scale)?',
-                'type': 'slider',
-                'min': 1,
-                'max': 10,
-                'required': True
-            },
-            {
-                'category': 'Support Systems',
-                'question': 'Who do you have for support in your life?',
-                'type': 'text',
-                'required': False
-            },
-            {
-                'category': 'Coping Strategies',
-                'question': 'What has helped you cope with difficulties in the past?',
-                'type': 'text',
-                'required': False
-            },
-            {
-                'category': 'Risk Assessment',
-                'question': 'Have you had thoughts about harming yourself?',
-                'type': 'select',
-                'options': [
-                    'No suicidal thoughts', 
-                    'Passive ideation', 
-                    'Active ideation without plan', 
-                    'Active ideation with plan', 
-                    'Recent attempt'
-                ],
-                'required': True
-            },
-            {
-                'category': 'Risk Assessment',
-                'question': 'Have you had thoughts about harming others?',
-                'type': 'select',
-                'options': ['None', 'Low', 'Moderate', 'High'],
-                'required': True
-            }
-        ],
-        'guidelines': """
-        # Listening Session Guidelines
-        
-        ## Principles of PFA Listening
-        
-        1. **Create a safe space** - Find a quiet, private location for the conversation
-        2. **Be present and attentive** - Give your full attention to the person
-        3. **Use active listening** - Reflect back what you hear, ask clarifying questions
-        4. **Avoid judgment** - Be accepting and non-judgmental
-        5. **Respect confidentiality** - Ensure privacy except when safety is at risk
-        
-        ## Key Techniques
-        
-        - Maintain appropriate eye contact
-        - Use open body language
-        - Allow silences
-        - Validate feelings and experiences
-        - Use open-ended questions
-        - Avoid giving advice or false reassurance
-        - Watch for signs of distress during the conversation
-        
-        ## Risk Assessment
-        
-        If the person indicates thoughts of suicide or harm to others:
-        
-        - Ask direct questions about plans and intentions
-        - Assess if they have means to carry out the plan
-        - Determine if there is imminent danger
-        - Contact emergency services if necessary
-        - Never leave a high-risk individual alone
-        
-        ## Closing the Session
-        
-        - Summarize key points from the conversation
-        - Identify next steps and resources
-        - Schedule follow-up if appropriate
-        - Provide emergency contact information
-        """
-    }
-    
-    # Youth-focused Listening Template
-    youth_listening = {
-        'name': 'Youth-Focused Listening Session',
-        'description': 'A tailored approach for conducting psychological first aid listening sessions with adolescents and young adults.',
-        'questions': [
-            {
-                'category': 'Presenting Problems',
-                'question': 'What\'s been going on that brought you here today?',
-                'type': 'text',
-                'required': True
-            },
-            {
-                'category': 'School/Work',
-                'question': 'How have things been going at school/work?',
-                'type': 'text',
-                'required': False
-            },
-            {
-                'category': 'Relationships',
-                'question': 'How are things with your friends and family?',
-                'type': 'text',
-                'required': False
-            },
-            {
-                'category': 'Narrative',
-                'question': 'Can you tell me more about what\'s been happening?',
-                'type': 'textarea',
-                'required': True
-            },
-            {
-                'category': 'Emotional State',
-                'question': 'What feelings have you been having lately?',
-                'type': 'select',
-                'options': [
-                    'Sadness', 'Worry', 'Fear', 'Anger', 'Overwhelmed', 
-                    'Hopelessness', 'Embarrassment', 'Loneliness', 'Numbness', 'Other'
-                ],
-                'required': True
-            },
-            {
-                'category': 'Emotional State',
-                'question': 'On a scale of 1-10, how strong are these feelings?',
-                'type': 'slider',
-                'min': 1,
-                'max': 10,
-                'required': True
-            },
-            {
-                'category': 'Support Systems',
-                'question': 'Who do you talk to when you\'re having a hard time?',
-                'type': 'text',
-                'required': False
-            },
-            {
-                'category': 'Coping Strategies',
-                'question': 'What do you do to feel better when you\'re upset?',
-                'type': 'text',
-                'required': False
-            },
-            {
-                'category': 'Online/Social Media',
-                'question': 'How do you use social media or online platforms?',
-                'type': 'text',
-                'required': False
-            },
-            {
-                'category': 'Risk Assessment',
-                'question': 'Have you had thoughts about hurting yourself?',
-                'type': 'select',
-                'options': [
-                    'No thoughts of self-harm', 
-                    'Occasional thoughts without plan', 
-                    'Frequent thoughts without plan', 
-                    'Thoughts with plan', 
-                    'Recent self-harm'
-                ],
-                'required': True
-            },
-            {
-                'category': 'Risk Assessment',
-                'question': 'Have you had thoughts about hurting others?',
-                'type': 'select',
-                'options': ['None', 'Low', 'Moderate', 'High'],
-                'required': True
-            },
-            {
-                'category': 'Safety',
-                'question': 'Do you feel safe at home and school?',
-                'type': 'select',
-                'options': ['Always safe', 'Usually safe', 'Sometimes unsafe', 'Often unsafe'],
-                'required': True
-            }
-        ],
-        'guidelines': """
-        # Youth-Focused Listening Guidelines
-        
-        ## Special Considerations for Youth
-        
-        1. **Use age-appropriate language** - Adjust your vocabulary to match the youth's developmental level
-        2. **Consider confidentiality limits** - Clearly explain when information must be shared (safety concerns)
-        3. **Be authentic** - Youth can detect insincerity quickly
-        4. **Allow autonomy** - Give choices when possible to help them feel empowered
-        5. **Limit distractions** - Create an environment conducive to conversation
-        
-        ## Engagement Techniques
-        
-        - Start with less sensitive topics to build rapport
-        - Use their language and terminology when appropriate
-        - Show genuine curiosity about their experiences
-        - Acknowledge their expertise about their own life
-        - Normalize their experiences when appropriate
-        - Validate their feelings without minimizing them
-        
-        ## Risk Assessment for Youth
-        
-        When assessing risk:
-        
-        - Watch for warning signs of suicide risk (withdrawal, giving away possessions, etc.)
-        - Be direct when asking about self-harm or suicidal thoughts
-        - Assess for bullying, abuse, or other safety concerns
-        - Consider online safety and cyberbullying
-        - Involve parents/guardians when appropriate for safety
-        
-        ## Closing the Session
-        
-        - Summarize strengths and resources you've identified
-        - Discuss specific next steps
-        - Provide resources that are youth-friendly
-        - Explain what will happen next in concrete terms
-        - End on a note of hope and capability
-        """
-    }
-    
-    # Store templates in database
-    templates = [pfa_listening, youth_listening]
-    imported_count = 0
-    
-    for template in templates:
-        result = save_listening_template(template)
-        if result:
-            imported_count += 1
-    
-    return imported_count
+    """Import the default listening templates that are not in the database yet; returns how many (None on error)"""
+    imported_ids = save_listening_templates_bulk(DEFAULT_LISTENING_TEMPLATES)
+    return None if imported_ids is None else len(imported_ids)
+
+def get_template_page_cursors():
+    """Keyset cursors of the View table pages visited so far (None starts the first page)"""
+    return st.session_state.setdefault('listening_template_cursors', [None])
+
+def show_previous_template_page():
+    st.session_state.listening_template_page -= 1
+
+def show_next_template_page(last_template):
+    cursors = get_template_page_cursors()
+    page = st.session_state.listening_template_page
+    del cursors[page + 1:]
+    cursors.append((last_template['name'], last_template['id']))
+    st.session_state.listening_template_page = page + 1
 
 def main():
     st.title("Listening Module Management")
@@ -378,33 +250,39 @@ def main():
     
     if action == "View Listening Templates":
         st.header("Available Listening Templates")
-        templates = get_all_listening_templates()
+        
+        # Page through the table with (name, id) keyset cursors
+        cursors = get_template_page_cursors()
+        page = st.session_state.setdefault('listening_template_page', 0)
+        templates = read_templates(list_listening_templates, cursors[page], TEMPLATES_PAGE_SIZE, default=[])
+        
+        if page > 0 or len(templates) == TEMPLATES_PAGE_SIZE:
+            col1, col2, col3 = st.columns([1, 1, 4])
+            col1.button("Previous", disabled=page == 0, on_click=show_previous_template_page)
+            col2.button("Next", disabled=len(templates) < TEMPLATES_PAGE_SIZE,
+                        on_click=show_next_template_page, args=(templates[-1] if templates else None,))
+            col3.write(f"Page {page + 1}")
         
         if not templates:
             st.info("No listening templates found in the database. Add a new template or import default templates to get started.")
         else:
-            # Display as a table
-            templates_table = []
-            for template in templates:
-                question_count = len(template.get('questions', [])) if isinstance(template.get('questions', []), list) else 0
-                templates_table.append({
-                    "ID": template['id'],
-                    "Name": template['name'],
-                    "Questions": question_count,
-                    "Last Updated": template.get('updated_at', '')
-                })
-            
-            df = pd.DataFrame(templates_table)
+            # Display as a table, built column by column
+            df = pd.DataFrame({
+                "ID": [t['id'] for t in templates],
+                "Name": [t['name'] for t in templates],
+                "Questions": [t['question_count'] for t in templates],
+                "Last Updated": [t.get('updated_at', '') for t in templates]
+            })
             st.dataframe(df, use_container_width=True)
             
             # Display detailed information for a selected template
             if templates:
-                template_ids = {t['id']: t['name'] for t in templates}
+                templates_by_id = {t['id']: t for t in templates}
                 selected_id = st.selectbox("Select a template to view details", 
-                                          options=list(template_ids.keys()),
-                                          format_func=lambda x: template_ids[x])
+                                          options=list(templates_by_id.keys()),
+                                          format_func=lambda x: templates_by_id[x]['name'])
                 
-                selected_template = next((t for t in templates if t['id'] == selected_id), None)
+                selected_template = read_templates(get_listening_template, selected_id)
                 
                 if selected_template:
                     st.subheader(f"Details for {selected_template['name']}")
@@ -416,34 +294,20 @@ def main():
                         questions = selected_template.get('questions', [])
                         if isinstance(questions, list):
                             # Group questions by category
-                            questions_by_category = {}
-                            for q in questions:
-                                if isinstance(q, dict):
-                                    category = q.get('category', 'General')
-                                    if category not in questions_by_category:
-                                        questions_by_category[category] = []
-                                    questions_by_category[category].append(q)
+                            questions_by_category = group_questions_by_category(
+                                (selected_template['id'], selected_template.get('updated_at')),
+                                questions
+                            )
                             
-                            # Display questions grouped by category
-                            for category, category_questions in questions_by_category.items():
-                                st.markdown(f"### {category}")
-                                for i, q in enumerate(category_questions, 1):
-                                    st.write(f"{i}. {q.get('question', '')}")
-                                    st.write(f"   *Type: {q.get('type', 'text')}*")
-                                    
-                                    if q.get('type') == 'select' and 'options' in q:
-                                        st.write("   Options:")
-                                        for opt in q['options']:
-                                            st.write(f"   - {opt}")
-                                    
-                                    if q.get('required', False):
-                                        st.write("   *Required*")
-                                    st.write("")
+                            # Display questions grouped by category as a single markdown element
+                            st.markdown(format_questions_markdown(questions_by_category))
                         else:
                             st.write("No questions available")
                     
-                    with st.expander("Guidelines"):
-                        st.markdown(selected_template.get('guidelines', 'No guidelines available'))
+                    # Expander bodies always run, so only fetch guidelines once asked for
+                    if st.toggle("Show guidelines", key=f"show_guidelines_{selected_id}"):
+                        with st.container(border=True):
+                            st.markdown(read_templates(get_template_guidelines, selected_id) or 'No guidelines available')
     
     elif action == "Add New Template":
         st.header("Add New Listening Template")
@@ -485,10 +349,12 @@ def main():
             if submitted:
                 if not name or not questions_json:
                     st.error("Name and questions are required fields")
+                elif len(questions_json.encode()) > MAX_TEMPLATE_BYTES:
+                    st.error(f"Questions JSON is too large (limit is {MAX_TEMPLATE_BYTES // 1024} KB)")
                 else:
                     try:
                         # Parse questions JSON
-                        questions = json.loads(questions_json)
+                        questions = orjson.loads(questions_json)
                         
                         # Validate questions format
                         if not isinstance(questions, list):
@@ -508,24 +374,23 @@ def main():
                             st.success(f"Listening template '{name}' added successfully with ID: {result}")
                         else:
                             st.error("Failed to add listening template")
-                    except json.JSONDecodeError:
+                    except orjson.JSONDecodeError:
                         st.error("Invalid JSON format for questions. Please check your syntax.")
     
     elif action == "Edit Template":
         st.header("Edit Listening Template")
         
-        templates = get_all_listening_templates()
-        if not templates:
+        template_index = read_templates(get_template_index, default=())
+        if not template_index:
             st.info("No listening templates found in the database.")
             return
         
         # Select template to edit
-        template_ids = {t['id']: t['name'] for t in templates}
-        selected_id = st.selectbox("Select a template to edit", 
-                                  options=list(template_ids.keys()),
-                                  format_func=lambda x: template_ids[x])
+        selected_id, _, _ = st.selectbox("Select a template to edit", 
+                                         options=template_index,
+                                         format_func=lambda t: t[1])
         
-        selected_template = next((t for t in templates if t['id'] == selected_id), None)
+        selected_template = read_templates(get_listening_template, selected_id)
         
         if selected_template:
             with st.form("edit_template_form"):
@@ -533,23 +398,25 @@ def main():
                 description = st.text_area("Description", value=selected_template['description'])
                 
                 # Convert questions to JSON for editing
-                questions_json = json.dumps(selected_template.get('questions', []), indent=2)
+                questions_json = orjson.dumps(selected_template.get('questions', []), option=orjson.OPT_INDENT_2).decode()
                 
                 st.subheader("Questions (JSON format)")
                 questions_json = st.text_area("Questions", value=questions_json, height=300)
                 
                 guidelines = st.text_area("Guidelines (Markdown format)", 
-                                        value=selected_template.get('guidelines', ''))
+                                        value=read_templates(get_template_guidelines, selected_id) or '')
                 
                 submitted = st.form_submit_button("Update Listening Template")
                 
                 if submitted:
                     if not name or not questions_json:
                         st.error("Name and questions are required fields")
+                    elif len(questions_json.encode()) > MAX_TEMPLATE_BYTES:
+                        st.error(f"Questions JSON is too large (limit is {MAX_TEMPLATE_BYTES // 1024} KB)")
                     else:
                         try:
                             # Parse questions JSON
-                            questions = json.loads(questions_json)
+                            questions = orjson.loads(questions_json)
                             
                             # Validate questions format
                             if not isinstance(questions, list):
@@ -569,29 +436,26 @@ def main():
                                 st.success(f"Listening template '{name}' updated successfully")
                             else:
                                 st.error("Failed to update listening template")
-                        except json.JSONDecodeError:
+                        except orjson.JSONDecodeError:
                             st.error("Invalid JSON format for questions. Please check your syntax.")
     
     elif action == "Delete Template":
         st.header("Delete Listening Template")
         st.warning("Caution: Deleting a template is permanent and cannot be undone.")
         
-        templates = get_all_listening_templates()
-        if not templates:
+        template_index = read_templates(get_template_index, default=())
+        if not template_index:
             st.info("No listening templates found in the database.")
             return
         
         # Select template to delete
-        template_ids = {t['id']: t['name'] for t in templates}
-        selected_id = st.selectbox("Select a template to delete", 
-                                  options=list(template_ids.keys()),
-                                  format_func=lambda x: template_ids[x])
-        
-        selected_template = next((t for t in templates if t['id'] == selected_id), None)
+        selected_id, selected_name, question_count = st.selectbox("Select a template to delete", 
+                                                                  options=template_index,
+                                                                  format_func=lambda t: t[1])
         
-        if selected_template:
-            st.write(f"You are about to delete: **{selected_template['name']}**")
-            st.write(f"This template has {len(selected_template.get('questions', []))} questions.")
+        if selected_id:
+            st.write(f"You are about to delete: **{selected_name}**")
+            st.write(f"This template has {question_count} questions.")
             
             # Confirmation
             if st.button("Confirm Deletion", type="primary"):
@@ -609,15 +473,17 @@ def main():
         1. Standard PFA Listening Session
         2. Youth-Focused Listening Session
         
-        If these templates already exist in the database, duplicates will be created.
+        Templates that already exist in the database (matched by name) are left unchanged, so edits made to them are kept.
         """)
         
         if st.button("Import Default Templates", type="primary"):
             imported_count = import_default_templates()
-            if imported_count > 0:
+            if imported_count is None:
+                st.error("Failed to import default templates")
+            elif imported_count > 0:
                 st.success(f"Successfully imported {imported_count} default listening templates")
             else:
-                st.error("Failed to import default templates")
+                st.info("The default listening templates are already in the database")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,16 @@
 import streamlit as st
 import datetime
-import pandas as pd
-from utils.database import save_patient, get_patient, get_patients
+from utils.database import save_patient
+from utils.cached_db import cached_get_patient, cached_get_patients
+from utils.constants import (
+    sel_default,
+    GENDER_OPTS, GENDER_IDX,
+    APPEARANCE_OPTS, APPEARANCE_IDX,
+    EYE_CONTACT_OPTS, EYE_CONTACT_IDX,
+    DEMEANOR_OPTS, DEMEANOR_IDX,
+    DISTRESS_SIGNS_OPTS
+)
+from utils.widgets import patient_picker
 import uuid
 
 st.set_page_config(
@@ -15,7 +24,7 @@ if 'current_patient_id' not in st.session_state:
     st.session_state.current_patient_id = None
 
 def create_or_update_patient(patient_data):
-    """Create or update a patient record"""
+    """Create or update a patient record; returns its ID, or None if it could not be saved"""
     patient_id = st.session_state.current_patient_id
     
     if not patient_id:
@@ -25,127 +34,138 @@ def create_or_update_patient(patient_data):
         patient_data['created_at'] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     else:
         # Update existing patient
-        existing_data = get_patient(patient_id)
+        existing_data = cached_get_patient(patient_id)
         if existing_data:
             patient_data['created_at'] = existing_data.get('created_at')
             
     patient_data['last_updated'] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    save_patient(patient_id, patient_data)
+    if not save_patient(patient_id, patient_data):
+        return None
     st.session_state.current_patient_id = patient_id
     return patient_id
 
-def main():
-    st.title("Patient Assessment (Look)")
+def _save_look_cb(key_prefix):
+    """Submit callback of the assessment form: save it from the keyed widget values"""
+    state = st.session_state
+    name = state[key_prefix + "name"]
+    if not name:
+        state.look_save_result = ('error', "Patient name is required.")
+        return
     
-    # Sidebar for existing patients
-    st.sidebar.title("Existing Patients")
-    patients = get_patients()
+    # Prepare patient data
+    visible_distress = state[key_prefix + "visible_distress"]
+    patient_data = {
+        'name': name,
+        'age': state[key_prefix + "age"],
+        'gender': state[key_prefix + "gender"],
+        'phone': state[key_prefix + "phone"],
+        'emergency_contact': state[key_prefix + "emergency_contact"],
+        'appearance': state[key_prefix + "appearance"],
+        'eye_contact': state[key_prefix + "eye_contact"],
+        'demeanor': state[key_prefix + "demeanor"],
+        'visible_distress': visible_distress,
+        'distress_signs': state.get(key_prefix + "distress_signs", []) if visible_distress else [],
+        'immediate_concerns': state[key_prefix + "immediate_concerns"],
+        'physical_notes': state[key_prefix + "physical_notes"],
+        'assessment_step': 'look',
+        'look_complete': True
+    }
     
-    if patients:
-        patient_options = ["New Patient"] + [f"{p['name']} (ID: {p['id']})" for p in patients]
-        selected_patient = st.sidebar.selectbox("Select a patient", patient_options)
-        
-        if selected_patient != "New Patient":
-            # Extract patient ID from selection
-            patient_id = selected_patient.split("ID: ")[1].rstrip(")")
-            st.session_state.current_patient_id = patient_id
-            
-            # Load patient data
-            patient_data = get_patient(patient_id)
-            if patient_data:
-                st.info(f"Editing patient: {patient_data.get('name', '')}")
-        else:
-            st.session_state.current_patient_id = None
-    else:
-        st.sidebar.info("No existing patients found.")
-        st.session_state.current_patient_id = None
+    # Save patient data
+    if not create_or_update_patient(patient_data):
+        state.look_save_result = ('error', "The assessment could not be saved. Please try again.")
+        return
+    
+    # Drop the entries; the form is pre-filled from the saved record (or starts empty for a new patient)
+    for key in [key for key in state if key.startswith(key_prefix)]:
+        del state[key]
+    state.look_save_result = ('success', name)
+
+@st.fragment
+def assessment_form():
+    """Assessment form; submitting it saves in a callback and reruns only this fragment"""
+    # Load the selected patient once; the form is pre-filled from the same data
+    patient_data = (cached_get_patient(st.session_state.current_patient_id) or {}) if st.session_state.current_patient_id else {}
+    if patient_data:
+        st.info(f"Editing patient: {patient_data.get('name', '')}")
+    
+    # Widget keys are scoped to the patient, so entries never carry over to another patient
+    key_prefix = f"look_{st.session_state.current_patient_id or 'new'}_"
     
     # Form for patient assessment
     with st.form("patient_assessment_form"):
         st.subheader("Basic Information")
         col1, col2, col3 = st.columns(3)
         
-        # If editing, pre-fill the form
-        patient_data = get_patient(st.session_state.current_patient_id) if st.session_state.current_patient_id else {}
-        
         with col1:
-            name = st.text_input("Full Name", value=patient_data.get('name', ''))
+            st.text_input("Full Name", value=patient_data.get('name', ''), key=key_prefix + "name")
         with col2:
-            age = st.number_input("Age", min_value=1, max_value=120, value=int(patient_data.get('age', 25)))
+            st.number_input("Age", min_value=1, max_value=120, value=int(patient_data.get('age', 25)), key=key_prefix + "age")
         with col3:
-            gender = st.selectbox("Gender", ["Male", "Female", "Other"], 
-                                 index=["Male", "Female", "Other"].index(patient_data.get('gender', 'Male')) if patient_data.get('gender') else 0)
+            st.selectbox("Gender", GENDER_OPTS, 
+                         index=sel_default(patient_data, 'gender', GENDER_IDX), key=key_prefix + "gender")
         
         st.subheader("Contact Information")
         col1, col2 = st.columns(2)
         with col1:
-            phone = st.text_input("Phone Number", value=patient_data.get('phone', ''))
+            st.text_input("Phone Number", value=patient_data.get('phone', ''), key=key_prefix + "phone")
         with col2:
-            emergency_contact = st.text_input("Emergency Contact", value=patient_data.get('emergency_contact', ''))
+            st.text_input("Emergency Contact", value=patient_data.get('emergency_contact', ''), key=key_prefix + "emergency_contact")
         
         st.subheader("Physical Assessment (Look)")
         
         col1, col2 = st.columns(2)
         with col1:
-            appearance = st.selectbox("Overall Appearance", 
-                                     ["Normal", "Disheveled", "Well-groomed", "Unkempt", "Agitated", "Lethargic"],
-                                     index=["Normal", "Disheveled", "Well-groomed", "Unkempt", "Agitated", "Lethargic"].index(patient_data.get('appearance', 'Normal')) if patient_data.get('appearance') else 0)
+            st.selectbox("Overall Appearance", 
+                         APPEARANCE_OPTS,
+                         index=sel_default(patient_data, 'appearance', APPEARANCE_IDX), key=key_prefix + "appearance")
         with col2:
-            eye_contact = st.selectbox("Eye Contact", 
-                                      ["Normal", "Avoidant", "Intense", "Minimal", "Absent"],
-                                      index=["Normal", "Avoidant", "Intense", "Minimal", "Absent"].index(patient_data.get('eye_contact', 'Normal')) if patient_data.get('eye_contact') else 0)
+            st.selectbox("Eye Contact", 
+                         EYE_CONTACT_OPTS,
+                         index=sel_default(patient_data, 'eye_contact', EYE_CONTACT_IDX), key=key_prefix + "eye_contact")
         
-        demeanor = st.selectbox("Demeanor/Affect", 
-                               ["Calm", "Anxious", "Depressed", "Irritable", "Flat", "Labile", "Euphoric", "Confused"],
-                               index=["Calm", "Anxious", "Depressed", "Irritable", "Flat", "Labile", "Euphoric", "Confused"].index(patient_data.get('demeanor', 'Calm')) if patient_data.get('demeanor') else 0)
+        st.selectbox("Demeanor/Affect", 
+                     DEMEANOR_OPTS,
+                     index=sel_default(patient_data, 'demeanor', DEMEANOR_IDX), key=key_prefix + "demeanor")
         
-        visible_distress = st.checkbox("Signs of Visible Distress", value=patient_data.get('visible_distress', False))
+        visible_distress = st.checkbox("Signs of Visible Distress", value=patient_data.get('visible_distress', False),
+                                       key=key_prefix + "visible_distress")
         
         if visible_distress:
-            distress_signs = st.multiselect("Signs of Distress", 
-                                          ["Crying", "Trembling", "Sweating", "Rapid breathing", "Pacing", "Self-harm marks", "Other"],
-                                          default=patient_data.get('distress_signs', []))
-        else:
-            distress_signs = []
+            st.multiselect("Signs of Distress", 
+                           DISTRESS_SIGNS_OPTS,
+                           default=tuple(patient_data.get('distress_signs', ())), key=key_prefix + "distress_signs")
         
         st.subheader("Initial Observations")
-        immediate_concerns = st.text_area("Immediate Concerns or Needs", value=patient_data.get('immediate_concerns', ''))
-        physical_notes = st.text_area("Additional Physical Assessment Notes", value=patient_data.get('physical_notes', ''))
-        
-        # Submit button
-        submitted = st.form_submit_button("Save Assessment")
+        st.text_area("Immediate Concerns or Needs", value=patient_data.get('immediate_concerns', ''), key=key_prefix + "immediate_concerns")
+        st.text_area("Additional Physical Assessment Notes", value=patient_data.get('physical_notes', ''), key=key_prefix + "physical_notes")
         
-        if submitted:
-            if not name:
-                st.error("Patient name is required.")
-            else:
-                # Prepare patient data
-                patient_data = {
-                    'name': name,
-                    'age': age,
-                    'gender': gender,
-                    'phone': phone,
-                    'emergency_contact': emergency_contact,
-                    'appearance': appearance,
-                    'eye_contact': eye_contact,
-                    'demeanor': demeanor,
-                    'visible_distress': visible_distress,
-                    'distress_signs': distress_signs if visible_distress else [],
-                    'immediate_concerns': immediate_concerns,
-                    'physical_notes': physical_notes,
-                    'assessment_step': 'look',
-                    'look_complete': True
-                }
-                
-                # Save patient data
-                patient_id = create_or_update_patient(patient_data)
-                
-                st.success(f"Assessment saved successfully for {name}.")
-                st.info("Proceed to the Listening Module to continue the assessment.")
-                
-                # Add a continue button
-                if st.button("Continue to Listening Module"):
-                    st.switch_page("pages/2_Listening_Module.py")
+        # Submit button; the save itself runs in the callback before the rerun
+        st.form_submit_button("Save Assessment", on_click=_save_look_cb, args=(key_prefix,))
+    
+    result = st.session_state.get('look_save_result')
+    if result:
+        status, message = result
+        if status == 'error':
+            st.error(message)
+        else:
+            st.success(f"Assessment saved successfully for {message}.")
+            st.info("Proceed to the Listening Module to continue the assessment.")
+            
+            # Add a continue button
+            if st.button("Continue to Listening Module"):
+                st.switch_page("pages/2_Listening_Module.py")
+
+def main():
+    st.title("Patient Assessment (Look)")
+    
+    # Sidebar for existing patients
+    with st.sidebar:
+        st.title("Existing Patients")
+        patient_picker(cached_get_patients(), new_patient_label="New Patient",
+                       on_change=lambda: st.session_state.pop('look_save_result', None))
+    
+    assessment_form()
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,19 @@
 import streamlit as st
 import datetime
-import json
-from utils.database import save_patient, get_patient, get_patients
-from utils.constants import get_referral_options
-from utils.db_connector import get_db_connection, test_database_connection
+from bisect import bisect_right
+from utils.database import patch_patient, save_referral_and_patient, PatientNotFoundError
+from utils.cached_db import cached_get_patients, load_patient_cached, forget_cached_patient
+from utils.screening_tools import (
+    SRQ20_DISTRESS_LABELS, SRQ20_DISTRESS_THRESH,
+    SRQ29_SUBSCALES, SRQ29_CATEGORIES, SRQ29_MAX_SCORES, DASS42_SCALES, DASS42_CATEGORIES
+)
+from utils.constants import (
+    sel_default,
+    REFERRAL_TYPE_OPTS, REFERRAL_TYPE_IDX, CONSULTANT_REFERRAL_TYPES, PSYCHIATRIST_REFERRAL_TYPES,
+    URGENCY_OPTS, URGENCY_IDX, URGENT_REFERRAL_LEVELS
+)
+from utils.widgets import patient_picker
+from utils.db_connector import db_connection, prepare_statements, test_database_connection
 
 st.set_page_config(
     page_title="Referral System - PFA Counseling",
@@ -15,152 +25,321 @@ st.set_page_config(
 if 'current_patient_id' not in st.session_state:
     st.session_state.current_patient_id = None
 
-def update_patient_referral_data(referral_data):
-    """Update patient with referral data"""
+# Patient fields this page shows or pre-fills; only these are loaded
+REFERRAL_PAGE_FIELDS = (
+    'name', 'age', 'gender', 'contact', 'address', 'presenting_problems', 'listening_notes',
+    'srq20_score', 'srq29_score', *(f"srq29_{name}" for name in SRQ29_SUBSCALES),
+    'dass_complete', *(f"dass_{name}_{part}" for name in DASS42_SCALES for part in ('score', 'severity')),
+    'referral_needed', 'referral_type', 'referral_urgency', 'referral_reason',
+    'follow_up_plan', 'follow_up_date', 'additional_notes'
+)
+
+# Hot statements, prepared once per pooled connection and then EXECUTEd.
+# Each returns a single json cell built server-side with only the columns
+# this page shows, which psycopg2 decodes in one orjson call
+REFERRAL_STATEMENTS = {
+    'ref_providers': """
+        SELECT json_build_object(
+            'consultants', (
+                SELECT coalesce(json_agg(c ORDER BY c.name), '[]')
+                FROM (SELECT id, name, specialization, qualifications, contact_info FROM consultants) c
+            ),
+            'psychiatrists', (
+                SELECT coalesce(json_agg(p ORDER BY p.name), '[]')
+                FROM (SELECT id, name, specialization, qualifications, hospital, contact_info FROM psychiatrists) p
+            )
+        )
+    """,
+    'ref_by_patient': """
+        SELECT coalesce(json_agg(json_build_object(
+                   'created_at', to_char(r.created_at, 'YYYY-MM-DD'),
+                   'status', r.status,
+                   'reason', r.reason,
+                   'notes', r.notes,
+                   'appointment_date', to_char(r.appointment_date, 'YYYY-MM-DD HH24:MI'),
+                   'consultant_name', c.name,
+                   'psychiatrist_name', p.name
+               ) ORDER BY r.created_at DESC), '[]')
+        FROM referrals r
+        LEFT JOIN consultants c ON r.consultant_id = c.id
+        LEFT JOIN psychiatrists p ON r.psychiatrist_id = p.id
+        WHERE r.patient_id = $1::varchar
+    """,
+}
+
+def update_patient_referral_data(referral_data, db_referral_data=None):
+    """Update patient with referral data, creating the referral record in the same write if given"""
     patient_id = st.session_state.current_patient_id
     
     if not patient_id:
         st.error("No patient selected. Please complete previous assessments first.")
         return None
     
-    existing_data = get_patient(patient_id)
-    if existing_data:
-        # Update only the referral fields
-        existing_data.update(referral_data)
-        existing_data['last_updated'] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        existing_data['referral_complete'] = True
-        existing_data['assessment_complete'] = True
-        existing_data['assessment_step'] = 'complete'
-        
-        save_patient(patient_id, existing_data)
+    # Update only the referral fields, in a single write
+    delta = {
+        **referral_data,
+        'last_updated': datetime.datetime.now().isoformat(sep=' ', timespec='seconds'),
+        'referral_complete': True,
+        'assessment_complete': True,
+        'assessment_step': 'complete'
+    }
+    
+    if db_referral_data:
+        # Referral row and patient update commit together; a database error is already reported
+        try:
+            result = save_referral_and_patient(db_referral_data, delta)
+        except PatientNotFoundError:
+            st.error("Patient data not found. Please complete previous assessments first.")
+            return None
+        if not result:
+            return None
+        # Previous Referrals must show the new one
+        get_patients_referrals.clear()
+    else:
+        result = patch_patient(patient_id, delta)
+    
+    if result:
+        forget_cached_patient(patient_id)
         return patient_id
     else:
         st.error("Patient data not found. Please complete previous assessments first.")
         return None
 
-def create_database_referral(referral_data):
-    """Create a new referral record in the database"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                # Insert new referral
-                cur.execute("""
-                    INSERT INTO referrals 
-                    (patient_id, consultant_id, psychiatrist_id, reason, notes, status, appointment_date)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                """, (
-                    referral_data['patient_id'],
-                    referral_data.get('consultant_id'),
-                    referral_data.get('psychiatrist_id'),
-                    referral_data['reason'],
-                    referral_data.get('notes', ''),
-                    referral_data.get('status', 'pending'),
-                    referral_data.get('appointment_date')
-                ))
-                
-                result = cur.fetchone()
-                conn.commit()
-                return result[0] if result else None
-        except Exception as e:
-            st.error(f"Error creating referral: {e}")
-        finally:
-            conn.close()
-    return None
+# Cached lookups raise on database errors, so a failure is never cached; callers report it
 
-def get_all_consultants():
-    """Get all mental health consultants from the database"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute("SELECT * FROM consultants ORDER BY name ASC")
-                columns = [desc[0] for desc in cur.description]
-                result = cur.fetchall()
+@st.cache_data(ttl=300, show_spinner=False)
+def get_all_providers():
+    """Get all mental health consultants and psychiatrists from the database in one query"""
+    with db_connection() as conn:
+        prepare_statements(conn, REFERRAL_STATEMENTS)
+        with conn.cursor() as cur:
+            cur.execute("EXECUTE ref_providers")
+            providers = cur.fetchone()[0]
+            return providers['consultants'], providers['psychiatrists']
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_patients_referrals(patient_id):
+    """Get all referrals for a specific patient from the database"""
+    with db_connection() as conn:
+        prepare_statements(conn, REFERRAL_STATEMENTS)
+        with conn.cursor() as cur:
+            cur.execute("EXECUTE ref_by_patient (%s)", (patient_id,))
+            return cur.fetchone()[0]
+
+@st.fragment
+def referral_form(patient_id, patient_data, consultants, psychiatrists):
+    """New referral and follow-up form; submitting it reruns only this fragment"""
+    # Providers by ID, so the selected one is found without scanning the lists
+    consultants_by_id = {c['id']: c for c in consultants}
+    psychiatrists_by_id = {p['id']: p for p in psychiatrists}
+    
+    with st.form("referral_form"):
+        st.subheader("New Referral")
+        
+        # Widget keys are scoped to the patient, so entries survive unrelated
+        # reruns and never carry over to another patient
+        key_prefix = f"referral_{patient_id}_"
+        
+        # Pre-fill form if data exists
+        referral_needed = st.checkbox("Referral Needed", 
+                                    value=patient_data.get('referral_needed', False),
+                                    key=key_prefix + "needed")
+        
+        if referral_needed:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                referral_type = st.selectbox(
+                    "Referral Type",
+                    REFERRAL_TYPE_OPTS,
+                    index=sel_default(patient_data, 'referral_type', REFERRAL_TYPE_IDX),
+                    key=key_prefix + "type"
+                )
+            
+            with col2:
+                referral_urgency = st.selectbox(
+                    "Urgency",
+                    URGENCY_OPTS,
+                    index=sel_default(patient_data, 'referral_urgency', URGENCY_IDX, URGENCY_IDX["Standard (1-2 weeks)"]),
+                    key=key_prefix + "urgency"
+                )
+            
+            # Select referral provider based on type
+            consultant_id = None
+            psychiatrist_id = None
+            
+            if referral_type in CONSULTANT_REFERRAL_TYPES and consultants:
+                selected_consultant_id = st.selectbox(
+                    "Select Mental Health Consultant",
+                    options=list(consultants_by_id),
+                    format_func=lambda x: f"{consultants_by_id[x]['name']} - {consultants_by_id[x]['specialization']}",
+                    key=key_prefix + "consultant"
+                )
+                consultant_id = selected_consultant_id
                 
-                # Convert to list of dictionaries
-                consultants = []
-                for row in result:
-                    consultant_dict = dict(zip(columns, row))
-                    
-                    # Parse JSONB fields
-                    if 'contact_info' in consultant_dict and consultant_dict['contact_info']:
-                        consultant_dict['contact_info'] = json.loads(consultant_dict['contact_info'])
-                    if 'availability' in consultant_dict and consultant_dict['availability']:
-                        consultant_dict['availability'] = json.loads(consultant_dict['availability'])
+                # Show selected consultant details
+                selected_consultant = consultants_by_id.get(selected_consultant_id)
+                if selected_consultant:
+                    with st.expander("Consultant Details"):
+                        st.write(f"**Name:** {selected_consultant['name']}")
+                        st.write(f"**Specialization:** {selected_consultant['specialization']}")
+                        st.write(f"**Qualifications:** {selected_consultant['qualifications']}")
                         
-                    consultants.append(consultant_dict)
-                
-                return consultants
-        except Exception as e:
-            st.error(f"Error retrieving consultants: {e}")
-        finally:
-            conn.close()
-    return []
-
-def get_all_psychiatrists():
-    """Get all psychiatrists from the database"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute("SELECT * FROM psychiatrists ORDER BY name ASC")
-                columns = [desc[0] for desc in cur.description]
-                result = cur.fetchall()
+                        # Display contact info if available
+                        contact_info = selected_consultant.get('contact_info', {})
+                        if isinstance(contact_info, dict) and contact_info:
+                            st.write("**Contact Information:**")
+                            for key, value in contact_info.items():
+                                st.write(f"- {key.capitalize()}: {value}")
+            
+            if referral_type in PSYCHIATRIST_REFERRAL_TYPES and psychiatrists:
+                selected_psychiatrist_id = st.selectbox(
+                    "Select Psychiatrist",
+                    options=list(psychiatrists_by_id),
+                    format_func=lambda x: f"{psychiatrists_by_id[x]['name']} - {psychiatrists_by_id[x]['specialization']} ({psychiatrists_by_id[x]['hospital']})",
+                    key=key_prefix + "psychiatrist"
+                )
+                psychiatrist_id = selected_psychiatrist_id
                 
-                # Convert to list of dictionaries
-                psychiatrists = []
-                for row in result:
-                    psychiatrist_dict = dict(zip(columns, row))
-                    
-                    # Parse JSONB fields
-                    if 'contact_info' in psychiatrist_dict and psychiatrist_dict['contact_info']:
-                        psychiatrist_dict['contact_info'] = json.loads(psychiatrist_dict['contact_info'])
-                    if 'availability' in psychiatrist_dict and psychiatrist_dict['availability']:
-                        psychiatrist_dict['availability'] = json.loads(psychiatrist_dict['availability'])
+                # Show selected psychiatrist details
+                selected_psychiatrist = psychiatrists_by_id.get(selected_psychiatrist_id)
+                if selected_psychiatrist:
+                    with st.expander("Psychiatrist Details"):
+                        st.write(f"**Name:** {selected_psychiatrist['name']}")
+                        st.write(f"**Specialization:** {selected_psychiatrist['specialization']}")
+                        st.write(f"**Hospital/Clinic:** {selected_psychiatrist['hospital']}")
+                        st.write(f"**Qualifications:** {selected_psychiatrist['qualifications']}")
                         
-                    psychiatrists.append(psychiatrist_dict)
+                        # Display contact info if available
+                        contact_info = selected_psychiatrist.get('contact_info', {})
+                        if isinstance(contact_info, dict) and contact_info:
+                            st.write("**Contact Information:**")
+                            for key, value in contact_info.items():
+                                st.write(f"- {key.capitalize()}: {value}")
+            
+            # Warning messages if no providers are available
+            if referral_type in CONSULTANT_REFERRAL_TYPES and not consultants:
+                st.warning("No mental health consultants found in the database. Please add consultants in the Consultant Management page.")
+            
+            if referral_type in PSYCHIATRIST_REFERRAL_TYPES and not psychiatrists:
+                st.warning("No psychiatrists found in the database. Please add psychiatrists in the Psychiatrist Management page.")
+            
+            referral_reason = st.text_area(
+                "Reason for Referral",
+                value=patient_data.get('referral_reason', ''),
+                key=key_prefix + "reason"
+            )
+            
+            appointment_date = st.date_input(
+                "Tentative Appointment Date",
+                value=datetime.date.today() + datetime.timedelta(days=7),
+                key=key_prefix + "appointment_date"
+            )
+            
+            appointment_time = st.time_input(
+                "Tentative Appointment Time",
+                value=datetime.time(9, 0),
+                key=key_prefix + "appointment_time"
+            )
+            
+            appointment_datetime = datetime.datetime.combine(appointment_date, appointment_time)
+        else:
+            referral_type = ""
+            referral_urgency = ""
+            consultant_id = None
+            psychiatrist_id = None
+            referral_reason = ""
+            appointment_datetime = None
+        
+        st.subheader("Follow-up Plan")
+        
+        follow_up_plan = st.text_area(
+            "Follow-up Plan",
+            value=patient_data.get('follow_up_plan', ''),
+            key=key_prefix + "follow_up_plan"
+        )
+        
+        stored_follow_up_date = patient_data.get('follow_up_date')
+        follow_up_date = st.date_input(
+            "Follow-up Date",
+            value=datetime.date.fromisoformat(stored_follow_up_date) if stored_follow_up_date else datetime.date.today(),
+            key=key_prefix + "follow_up_date"
+        )
+        
+        additional_notes = st.text_area(
+            "Additional Notes",
+            value=patient_data.get('additional_notes', ''),
+            key=key_prefix + "additional_notes"
+        )
+        
+        # Submit button
+        submitted = st.form_submit_button("Save Referral Information")
+        
+        if submitted:
+            # Prepare referral data for patient record
+            referral_data = {
+                'referral_needed': referral_needed,
+                'follow_up_plan': follow_up_plan,
+                'follow_up_date': follow_up_date.isoformat(),
+                'additional_notes': additional_notes
+            }
+            
+            if referral_needed:
+                if not referral_reason:
+                    st.error("Please provide a reason for the referral.")
+                    return
                 
-                return psychiatrists
-        except Exception as e:
-            st.error(f"Error retrieving psychiatrists: {e}")
-        finally:
-            conn.close()
-    return []
-
-def get_patients_referrals(patient_id):
-    """Get all referrals for a specific patient from the database"""
-    conn = get_db_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT r.*, 
-                           c.name as consultant_name,
-                           p.name as psychiatrist_name
-                    FROM referrals r
-                    LEFT JOIN consultants c ON r.consultant_id = c.id
-                    LEFT JOIN psychiatrists p ON r.psychiatrist_id = p.id
-                    WHERE r.patient_id = %s
-                    ORDER BY r.created_at DESC
-                """, (patient_id,))
+                if referral_type == "Mental Health Consultant" and not consultant_id:
+                    st.error("Please select a mental health consultant.")
+                    return
                 
-                columns = [desc[0] for desc in cur.description]
-                result = cur.fetchall()
+                if referral_type == "Psychiatrist" and not psychiatrist_id:
+                    st.error("Please select a psychiatrist.")
+                    return
                 
-                # Convert to list of dictionaries
-                referrals = []
-                for row in result:
-                    referral_dict = dict(zip(columns, row))
-                    referrals.append(referral_dict)
+                if referral_type == "Both" and (not consultant_id or not psychiatrist_id):
+                    st.error("Please select both a mental health consultant and a psychiatrist.")
+                    return
                 
-                return referrals
-        except Exception as e:
-            st.error(f"Error retrieving patient referrals: {e}")
-        finally:
-            conn.close()
-    return []
+                # Add referral details to patient record
+                referral_data.update({
+                    'referral_type': referral_type,
+                    'referral_urgency': referral_urgency,
+                    'referral_reason': referral_reason
+                })
+                
+                # Referral record, saved together with the patient update
+                db_referral_data = {
+                    'patient_id': patient_id,
+                    'consultant_id': consultant_id if consultant_id and referral_type in CONSULTANT_REFERRAL_TYPES else None,
+                    'psychiatrist_id': psychiatrist_id if psychiatrist_id and referral_type in PSYCHIATRIST_REFERRAL_TYPES else None,
+                    'reason': referral_reason,
+                    'notes': additional_notes,
+                    'status': 'pending',
+                    'appointment_date': appointment_datetime if appointment_datetime else None
+                }
+            else:
+                db_referral_data = None
+            
+            # Update patient data
+            if not update_patient_referral_data(referral_data, db_referral_data):
+                return
+            
+            # Rerun the whole page so Previous Referrals lists the new referral;
+            # the confirmation is shown once, after that rerun
+            st.session_state[f"referral_saved_{patient_id}"] = referral_urgency if referral_needed else ""
+            st.rerun()
+    
+    # Buttons cannot live inside a form, so the confirmation and report link follow it
+    saved_urgency = st.session_state.pop(f"referral_saved_{patient_id}", None)
+    if saved_urgency is not None:
+        st.success("Referral information saved successfully.")
+        
+        if saved_urgency in URGENT_REFERRAL_LEVELS:
+            st.warning(f"⚠️ This is an {saved_urgency} referral. Please ensure the patient receives prompt care.")
+        
+        # A link needs no rerun, so it works although the flag is already gone
+        st.page_link("pages/5_Reports.py", label="View Patient Report")
 
 def main():
     st.title("Referral System (Link)")
@@ -173,132 +352,98 @@ def main():
     
     # Sidebar for patient selection
     st.sidebar.title("Patient Selection")
-    patients = get_patients()
-    
-    if not patients:
-        st.info("No patients in the database. Please complete patient assessment first.")
-        if st.button("Go to Patient Assessment"):
-            st.switch_page("pages/1_Patient_Assessment.py")
-        return
-    
-    # Filter to show only patients with completed 'screening' assessment
-    screening_completed_patients = [p for p in patients if p.get('screening_complete', False)]
+    # Only patients with a completed 'screening' assessment are fetched,
+    # and only the fields the picker shows
+    screening_completed_patients = cached_get_patients({'screening_complete': True}, fields=('id', 'name'))
     
     if not screening_completed_patients:
-        st.info("No patients with completed screening assessment. Please complete the screening tools first.")
-        if st.button("Go to Screening Tools"):
-            st.switch_page("pages/3_Screening_Tools.py")
+        if not cached_get_patients(fields=('id',)):
+            st.info("No patients in the database. Please complete patient assessment first.")
+            if st.button("Go to Patient Assessment"):
+                st.switch_page("pages/1_Patient_Assessment.py")
+        else:
+            st.info("No patients with completed screening assessment. Please complete the screening tools first.")
+            if st.button("Go to Screening Tools"):
+                st.switch_page("pages/3_Screening_Tools.py")
         return
     
-    patient_options = [f"{p['name']} (ID: {p['id']})" for p in screening_completed_patients]
-    selected_patient = st.sidebar.selectbox("Select a patient", patient_options)
-    
-    # Extract patient ID from selection
-    patient_id = selected_patient.split("ID: ")[1].rstrip(")")
-    st.session_state.current_patient_id = patient_id
+    with st.sidebar:
+        patient_picker(screening_completed_patients)
+        
+        # Provider lists are cached for a few minutes; pick up edits made since then
+        if st.button("Refresh providers"):
+            get_all_providers.clear()
+    patient_id = st.session_state.current_patient_id
     
     # Load patient data
-    patient_data = get_patient(patient_id)
+    patient_data = load_patient_cached(patient_id, REFERRAL_PAGE_FIELDS)
     
     if patient_data:
         st.info(f"Creating referral for: {patient_data.get('name', '')}, {patient_data.get('age', '')} years old")
         
-        # Display screening results summary
-        with st.expander("Assessment Summary", expanded=True):
+        # Display screening results summary; unlike a collapsed expander,
+        # a switched-off toggle skips building the summary altogether
+        if st.toggle("Show Assessment Summary", value=True, key="show_assessment_summary"):
+            # Look the stored results up once
+            get = patient_data.get
+            
             col1, col2 = st.columns(2)
             
             with col1:
                 st.subheader("Screening Results")
                 
+                srq20_score = get('srq20_score')
+                srq29_score = get('srq29_score')
+                
                 # SRQ-20 Score
-                if 'srq20_score' in patient_data:
-                    st.markdown(f"**SRQ-20 Score:** {patient_data['srq20_score']}/20")
+                if srq20_score is not None:
+                    st.markdown(f"**SRQ-20 Score:** {srq20_score}/20")
                     
                     # Add interpretation
-                    if patient_data['srq20_score'] <= 4:
-                        st.markdown("📊 **Interpretation:** No significant mental distress")
-                    elif patient_data['srq20_score'] <= 7:
-                        st.markdown("📊 **Interpretation:** Mild mental distress")
-                    elif patient_data['srq20_score'] <= 10:
-                        st.markdown("📊 **Interpretation:** Moderate mental distress")
-                    else:
-                        st.markdown("📊 **Interpretation:** Severe mental distress")
+                    distress = SRQ20_DISTRESS_LABELS[bisect_right(SRQ20_DISTRESS_THRESH, srq20_score)]
+                    st.markdown(f"📊 **Interpretation:** {distress}")
                 
-                # SRQ-29 Score
-                if 'srq29_score' in patient_data:
-                    st.markdown(f"**SRQ-29 Score:** {patient_data['srq29_score']}/29")
-                    
-                    if 'srq29_subscale_scores' in patient_data:
-                        subscales = patient_data['srq29_subscale_scores']
-                        st.markdown(f"- Anxiety/Depression: {subscales.get('anxiety_depression', 0)}/20")
-                        st.markdown(f"- Psychotic Symptoms: {subscales.get('psychotic', 0)}/4")
-                        st.markdown(f"- Epilepsy: {subscales.get('epilepsy', 0)}/1")
-                        st.markdown(f"- Alcohol: {subscales.get('alcohol', 0)}/4")
+                # SRQ-29 Score, with the subscales as saved by the Screening Tools page
+                if srq29_score is not None:
+                    st.markdown(f"**SRQ-29 Score:** {srq29_score}/29")
+                    st.markdown("\n".join(
+                        f"- {category}: {get(f'srq29_{name}', 0)}/{max_score}"
+                        for name, category, max_score in zip(SRQ29_SUBSCALES, SRQ29_CATEGORIES, SRQ29_MAX_SCORES)
+                    ))
                 
-                # DASS-42 Scores
-                if 'dass42_scores' in patient_data:
-                    scores = patient_data['dass42_scores']
+                # DASS-42 Scores, with the severities as saved by the Screening Tools page
+                if get('dass_complete'):
                     st.markdown("**DASS-42 Scores:**")
-                    
-                    depression = scores.get('depression', 0)
-                    st.markdown(f"- Depression: {depression}/42")
-                    if depression <= 9:
-                        st.markdown("  *Normal*")
-                    elif depression <= 13:
-                        st.markdown("  *Mild*")
-                    elif depression <= 20:
-                        st.markdown("  *Moderate*")
-                    elif depression <= 27:
-                        st.markdown("  *Severe*")
-                    else:
-                        st.markdown("  *Extremely Severe*")
-                    
-                    anxiety = scores.get('anxiety', 0)
-                    st.markdown(f"- Anxiety: {anxiety}/42")
-                    if anxiety <= 7:
-                        st.markdown("  *Normal*")
-                    elif anxiety <= 9:
-                        st.markdown("  *Mild*")
-                    elif anxiety <= 14:
-                        st.markdown("  *Moderate*")
-                    elif anxiety <= 19:
-                        st.markdown("  *Severe*")
-                    else:
-                        st.markdown("  *Extremely Severe*")
-                    
-                    stress = scores.get('stress', 0)
-                    st.markdown(f"- Stress: {stress}/42")
-                    if stress <= 14:
-                        st.markdown("  *Normal*")
-                    elif stress <= 18:
-                        st.markdown("  *Mild*")
-                    elif stress <= 25:
-                        st.markdown("  *Moderate*")
-                    elif stress <= 33:
-                        st.markdown("  *Severe*")
-                    else:
-                        st.markdown("  *Extremely Severe*")
+                    for name, category in zip(DASS42_SCALES, DASS42_CATEGORIES):
+                        st.markdown(f"- {category}: {get(f'dass_{name}_score', 0)}/42")
+                        st.markdown(f"  *{get(f'dass_{name}_severity', 'Not assessed')}*")
             
             with col2:
                 st.subheader("Patient Information")
-                st.markdown(f"**Name:** {patient_data.get('name', 'N/A')}")
-                st.markdown(f"**Age:** {patient_data.get('age', 'N/A')}")
-                st.markdown(f"**Gender:** {patient_data.get('gender', 'N/A')}")
-                st.markdown(f"**Contact:** {patient_data.get('contact', 'N/A')}")
-                st.markdown(f"**Address:** {patient_data.get('address', 'N/A')}")
+                st.markdown(f"**Name:** {get('name', 'N/A')}")
+                st.markdown(f"**Age:** {get('age', 'N/A')}")
+                st.markdown(f"**Gender:** {get('gender', 'N/A')}")
+                st.markdown(f"**Contact:** {get('contact', 'N/A')}")
+                st.markdown(f"**Address:** {get('address', 'N/A')}")
                 
-                if 'presenting_problems' in patient_data:
-                    st.markdown(f"**Presenting Problems:** {patient_data['presenting_problems']}")
+                presenting_problems = get('presenting_problems')
+                if presenting_problems is not None:
+                    st.markdown(f"**Presenting Problems:** {presenting_problems}")
                 
-                if 'listening_notes' in patient_data:
-                    st.markdown(f"**Listening Notes:** {patient_data['listening_notes']}")
+                listening_notes = get('listening_notes')
+                if listening_notes is not None:
+                    st.markdown(f"**Listening Notes:** {listening_notes}")
         
         # Display previous referrals for this patient
-        existing_referrals = get_patients_referrals(patient_id)
+        try:
+            existing_referrals = get_patients_referrals(patient_id)
+        except Exception as e:
+            st.error(f"Error retrieving patient referrals: {e}")
+            existing_referrals = []
         if existing_referrals:
             with st.expander("Previous Referrals", expanded=True):
                 for idx, ref in enumerate(existing_referrals):
-                    st.markdown(f"### Referral #{idx+1} - {ref['created_at'].strftime('%Y-%m-%d')}")
+                    st.markdown(f"### Referral #{idx+1} - {ref['created_at']}")
                     
                     col1, col2 = st.columns(2)
                     with col1:
@@ -313,201 +458,19 @@ def main():
                         if ref.get('notes'):
                             st.markdown(f"**Notes:** {ref['notes']}")
                         if ref.get('appointment_date'):
-                            st.markdown(f"**Appointment Date:** {ref['appointment_date'].strftime('%Y-%m-%d %H:%M')}")
+                            st.markdown(f"**Appointment Date:** {ref['appointment_date']}")
                     
                     st.divider()
         
         # Get lists of consultants and psychiatrists
-        consultants = get_all_consultants()
-        psychiatrists = get_all_psychiatrists()
+        try:
+            consultants, psychiatrists = get_all_providers()
+        except Exception as e:
+            st.error(f"Error retrieving consultants and psychiatrists: {e}")
+            consultants, psychiatrists = [], []
         
         # Referral Form
-        with st.form("referral_form"):
-            st.subheader("New Referral")
-            
-            # Pre-fill form if data exists
-            referral_needed = st.checkbox("Referral Needed", 
-                                        value=patient_data.get('referral_needed', False))
-            
-            if referral_needed:
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    referral_type = st.selectbox(
-                        "Referral Type",
-                        ["Mental Health Consultant", "Psychiatrist", "Both"]
-                    )
-                
-                with col2:
-                    referral_urgency = st.selectbox(
-                        "Urgency",
-                        ["Emergency (Immediate)", "Urgent (24-48 hours)", "Standard (1-2 weeks)", "Routine"],
-                        index=2  # Default to Standard
-                    )
-                
-                # Select referral provider based on type
-                consultant_id = None
-                psychiatrist_id = None
-                
-                if referral_type in ["Mental Health Consultant", "Both"] and consultants:
-                    consultant_options = {c['id']: f"{c['name']} - {c['specialization']}" for c in consultants}
-                    selected_consultant_id = st.selectbox(
-                        "Select Mental Health Consultant",
-                        options=list(consultant_options.keys()),
-                        format_func=lambda x: consultant_options[x]
-                    )
-                    consultant_id = selected_consultant_id
-                    
-                    # Show selected consultant details
-                    selected_consultant = next((c for c in consultants if c['id'] == selected_consultant_id), None)
-                    if selected_consultant:
-                        with st.expander("Consultant Details"):
-                            st.write(f"**Name:** {selected_consultant['name']}")
-                            st.write(f"**Specialization:** {selected_consultant['specialization']}")
-                            st.write(f"**Qualifications:** {selected_consultant['qualifications']}")
-                            
-                            # Display contact info if available
-                            contact_info = selected_consultant.get('contact_info', {})
-                            if isinstance(contact_info, dict) and contact_info:
-                                st.write("**Contact Information:**")
-                                for key, value in contact_info.items():
-                                    st.write(f"- {key.capitalize()}: {value}")
-                
-                if referral_type in ["Psychiatrist", "Both"] and psychiatrists:
-                    psychiatrist_options = {p['id']: f"{p['name']} - {p['specialization']} ({p['hospital']})" for p in psychiatrists}
-                    selected_psychiatrist_id = st.selectbox(
-                        "Select Psychiatrist",
-                        options=list(psychiatrist_options.keys()),
-                        format_func=lambda x: psychiatrist_options[x]
-                    )
-                    psychiatrist_id = selected_psychiatrist_id
-                    
-                    # Show selected psychiatrist details
-                    selected_psychiatrist = next((p for p in psychiatrists if p['id'] == selected_psychiatrist_id), None)
-                    if selected_psychiatrist:
-                        with st.expander("Psychiatrist Details"):
-                            st.write(f"**Name:** {selected_psychiatrist['name']}")
-                            st.write(f"**Specialization:** {selected_psychiatrist['specialization']}")
-                            st.write(f"**Hospital/Clinic:** {selected_psychiatrist['hospital']}")
-                            st.write(f"**Qualifications:** {selected_psychiatrist['qualifications']}")
-                            
-                            # Display contact info if available
-                            contact_info = selected_psychiatrist.get('contact_info', {})
-                            if isinstance(contact_info, dict) and contact_info:
-                                st.write("**Contact Information:**")
-                                for key, value in contact_info.items():
-                                    st.write(f"- {key.capitalize()}: {value}")
-                
-                # Warning messages if no providers are available
-                if referral_type in ["Mental Health Consultant", "Both"] and not consultants:
-                    st.warning("No mental health consultants found in the database. Please add consultants in the Consultant Management page.")
-                
-                if referral_type in ["Psychiatrist", "Both"] and not psychiatrists:
-                    st.warning("No psychiatrists found in the database. Please add psychiatrists in the Psychiatrist Management page.")
-                
-                referral_reason = st.text_area(
-                    "Reason for Referral",
-                    value=patient_data.get('referral_reason', '')
-                )
-                
-                appointment_date = st.date_input(
-                    "Tentative Appointment Date",
-                    value=datetime.datetime.now().date() + datetime.timedelta(days=7)
-                )
-                
-                appointment_time = st.time_input(
-                    "Tentative Appointment Time",
-                    value=datetime.time(9, 0)
-                )
-                
-                appointment_datetime = datetime.datetime.combine(appointment_date, appointment_time)
-            else:
-                referral_type = ""
-                referral_urgency = ""
-                consultant_id = None
-                psychiatrist_id = None
-                referral_reason = ""
-                appointment_datetime = None
-            
-            st.subheader("Follow-up Plan")
-            
-            follow_up_plan = st.text_area(
-                "Follow-up Plan",
-                value=patient_data.get('follow_up_plan', '')
-            )
-            
-            follow_up_date = st.date_input(
-                "Follow-up Date",
-                value=datetime.datetime.strptime(patient_data.get('follow_up_date', datetime.datetime.now().strftime("%Y-%m-%d")), "%Y-%m-%d").date()
-            )
-            
-            additional_notes = st.text_area(
-                "Additional Notes",
-                value=patient_data.get('additional_notes', '')
-            )
-            
-            # Submit button
-            submitted = st.form_submit_button("Save Referral Information")
-            
-            if submitted:
-                # Prepare referral data for patient record
-                referral_data = {
-                    'referral_needed': referral_needed,
-                    'follow_up_plan': follow_up_plan,
-                    'follow_up_date': follow_up_date.strftime("%Y-%m-%d"),
-                    'additional_notes': additional_notes
-                }
-                
-                if referral_needed:
-                    if not referral_reason:
-                        st.error("Please provide a reason for the referral.")
-                        return
-                    
-                    if referral_type == "Mental Health Consultant" and not consultant_id:
-                        st.error("Please select a mental health consultant.")
-                        return
-                    
-                    if referral_type == "Psychiatrist" and not psychiatrist_id:
-                        st.error("Please select a psychiatrist.")
-                        return
-                    
-                    if referral_type == "Both" and (not consultant_id or not psychiatrist_id):
-                        st.error("Please select both a mental health consultant and a psychiatrist.")
-                        return
-                    
-                    # Add referral details to patient record
-                    referral_data.update({
-                        'referral_type': referral_type,
-                        'referral_urgency': referral_urgency,
-                        'referral_reason': referral_reason
-                    })
-                    
-                    # Create database referral
-                    db_referral_data = {
-                        'patient_id': patient_id,
-                        'consultant_id': consultant_id if consultant_id and referral_type in ["Mental Health Consultant", "Both"] else None,
-                        'psychiatrist_id': psychiatrist_id if psychiatrist_id and referral_type in ["Psychiatrist", "Both"] else None,
-                        'reason': referral_reason,
-                        'notes': additional_notes,
-                        'status': 'pending',
-                        'appointment_date': appointment_datetime if appointment_datetime else None
-                    }
-                    
-                    referral_id = create_database_referral(db_referral_data)
-                    if referral_id:
-                        referral_data['database_referral_id'] = referral_id
-                
-                # Update patient data
-                update_patient_referral_data(referral_data)
-                
-                st.success("Referral information saved successfully.")
-                
-                if referral_needed and referral_urgency in ["Emergency (Immediate)", "Urgent (24-48 hours)"]:
-                    st.warning(f"⚠️ This is an {referral_urgency} referral. Please ensure the patient receives prompt care.")
-                
-                # Add a view reports button
-                if st.button("View Patient Report"):
-                    st.switch_page("pages/5_Reports.py")
+        referral_form(patient_id, patient_data, consultants, psychiatrists)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
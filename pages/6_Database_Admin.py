@@ -3,7 +3,7 @@ import os
 import json
 import pandas as pd
 from utils.db_connector import test_database_connection, initialize_database
-from utils.database import get_patients, save_patient, DATA_DIR
+from utils.database import ensure_db_initialized, get_patients, save_patient, DATA_DIR
 
 st.set_page_config(
     page_title="Database Admin - PFA Counseling",
@@ -27,6 +27,8 @@ def main():
         # Initialize database
         if initialize_database():
             st.success("✅ Database tables and schema initialized successfully")
+            # Switch the app back to the database if it started while it was down
+            ensure_db_initialized(retry=True)
         else:
             st.error("❌ Failed to initialize database schema")
             
@@ -69,8 +71,8 @@ def main():
             if file_count > 0 and st.button("Migrate File Data to Database"):
                 st.info("Starting migration of file-based data to database...")
                 
-                # Try to initialize database
-                if initialize_database():
+                # Try to initialize database, and make save_patient write to it
+                if initialize_database() and ensure_db_initialized(retry=True):
                     migration_success = 0
                     migration_failed = 0
                     
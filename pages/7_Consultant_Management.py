@@ -22,14 +22,8 @@ def get_all_consultants():
                 # Convert to list of dictionaries
                 consultants = []
                 for row in result:
+                    # JSONB fields arrive already decoded by psycopg2
                     consultant_dict = dict(zip(columns, row))
-                    
-                    # Parse JSONB fields
-                    if 'contact_info' in consultant_dict and consultant_dict['contact_info']:
-                        consultant_dict['contact_info'] = json.loads(consultant_dict['contact_info'])
-                    if 'availability' in consultant_dict and consultant_dict['availability']:
-                        consultant_dict['availability'] = json.loads(consultant_dict['availability'])
-                        
                     consultants.append(consultant_dict)
                 
                 return consultants
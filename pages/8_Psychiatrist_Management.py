@@ -22,14 +22,8 @@ def get_all_psychiatrists():
                 # Convert to list of dictionaries
                 psychiatrists = []
                 for row in result:
+                    # JSONB fields arrive already decoded by psycopg2
                     psychiatrist_dict = dict(zip(columns, row))
-                    
-                    # Parse JSONB fields
-                    if 'contact_info' in psychiatrist_dict and psychiatrist_dict['contact_info']:
-                        psychiatrist_dict['contact_info'] = json.loads(psychiatrist_dict['contact_info'])
-                    if 'availability' in psychiatrist_dict and psychiatrist_dict['availability']:
-                        psychiatrist_dict['availability'] = json.loads(psychiatrist_dict['availability'])
-                        
                     psychiatrists.append(psychiatrist_dict)
                 
                 return psychiatrists
@@ -0,0 +1,39 @@
+import streamlit as st
+from utils.database import get_patient, get_patients, get_patients_version
+
+# Patient reads shared across reruns; keyed on the write counter so a save
+# anywhere in the process invalidates them, with a TTL for other processes
+
+@st.cache_data(ttl=60, max_entries=8, show_spinner=False)
+def _get_patients(patients_version, filters=None, fields=None):
+    """Load all (or the filtered) patients for a given write version"""
+    return get_patients(filters, fields)
+
+@st.cache_data(ttl=60, max_entries=256, show_spinner=False)
+def _get_patient(patient_id, patients_version, fields=None):
+    """Load one patient (or the given fields of it) for a given write version"""
+    return get_patient(patient_id, fields)
+
+def cached_get_patients(filters=None, fields=None):
+    """Get all (or the filtered) patients, reusing the last load until a patient is written"""
+    return _get_patients(get_patients_version(), filters, fields)
+
+def cached_get_patient(patient_id, fields=None):
+    """Get a patient (or the given fields of it), reusing the last load until a patient is written"""
+    return _get_patient(patient_id, get_patients_version(), fields)
+
+def load_patient_cached(patient_id, fields=None):
+    """Get a patient (or the given fields of it) from this session's cache, reloading it only after a patient write"""
+    cache = st.session_state.setdefault('_patient_cache', {})
+    version = get_patients_version()
+    key = (patient_id, fields)
+    entry = cache.get(key)
+    if entry is None or entry[0] != version:
+        entry = cache[key] = (version, cached_get_patient(patient_id, fields))
+    return entry[1]
+
+def forget_cached_patient(patient_id):
+    """Drop a patient from this session's cache after it was saved"""
+    cache = st.session_state.get('_patient_cache', {})
+    for key in [key for key in cache if key[0] == patient_id]:
+        del cache[key]
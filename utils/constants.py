@@ -37,3 +37,52 @@ def get_referral_options():
             "School District Mental Health Services (123-456-7914)"
         ]
     }
+
+# Assessment form options, built once per process; the *_IDX maps give the
+# default selectbox index of a stored value in O(1)
+
+def sel_default(data, field, idx_map, default=0):
+    """Selectbox index of the stored value of a field, or default if it is unset or unknown"""
+    return idx_map.get(data.get(field), default)
+
+GENDER_OPTS = ("Male", "Female", "Other")
+GENDER_IDX = {v: i for i, v in enumerate(GENDER_OPTS)}
+
+APPEARANCE_OPTS = ("Normal", "Disheveled", "Well-groomed", "Unkempt", "Agitated", "Lethargic")
+APPEARANCE_IDX = {v: i for i, v in enumerate(APPEARANCE_OPTS)}
+
+EYE_CONTACT_OPTS = ("Normal", "Avoidant", "Intense", "Minimal", "Absent")
+EYE_CONTACT_IDX = {v: i for i, v in enumerate(EYE_CONTACT_OPTS)}
+
+DEMEANOR_OPTS = ("Calm", "Anxious", "Depressed", "Irritable", "Flat", "Labile", "Euphoric", "Confused")
+DEMEANOR_IDX = {v: i for i, v in enumerate(DEMEANOR_OPTS)}
+
+DISTRESS_SIGNS_OPTS = ("Crying", "Trembling", "Sweating", "Rapid breathing", "Pacing", "Self-harm marks", "Other")
+
+SUPPORT_SYSTEMS_OPTS = ("Family", "Friends", "Religious/Spiritual", "Community", "Professional", "None")
+
+EMOTION_OPTS = ("Anxiety", "Fear", "Sadness", "Grief", "Anger", "Guilt", "Shame", "Confusion", "Numbness", "Relief", "Other")
+EMOTION_IDX = {v: i for i, v in enumerate(EMOTION_OPTS)}
+
+SUICIDE_RISK_OPTS = ("None indicated", "Passive thoughts", "Active ideation without plan", "Active ideation with plan", "Recent attempt")
+SUICIDE_RISK_IDX = {v: i for i, v in enumerate(SUICIDE_RISK_OPTS)}
+
+HARM_RISK_OPTS = ("None indicated", "Low", "Moderate", "High")
+HARM_RISK_IDX = {v: i for i, v in enumerate(HARM_RISK_OPTS)}
+
+# Risk answers that flag a patient as high risk
+SUICIDE_HIGH = frozenset({"Active ideation with plan", "Recent attempt"})
+HARM_HIGH = frozenset({"Moderate", "High"})
+
+# Referral form options, and the values of them that call for a provider or prompt care
+REFERRAL_TYPE_OPTS = ("Mental Health Consultant", "Psychiatrist", "Both")
+REFERRAL_TYPE_IDX = {v: i for i, v in enumerate(REFERRAL_TYPE_OPTS)}
+CONSULTANT_REFERRAL_TYPES = frozenset({"Mental Health Consultant", "Both"})
+PSYCHIATRIST_REFERRAL_TYPES = frozenset({"Psychiatrist", "Both"})
+
+URGENCY_OPTS = ("Emergency (Immediate)", "Urgent (24-48 hours)", "Standard (1-2 weeks)", "Routine")
+URGENCY_IDX = {v: i for i, v in enumerate(URGENCY_OPTS)}
+URGENT_REFERRAL_LEVELS = frozenset({"Emergency (Immediate)", "Urgent (24-48 hours)"})
+
+# Most patients listed in a sidebar picker at once; narrow the rest down by search
+PATIENT_PICKER_LIMIT = 50
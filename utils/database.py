@@ -1,22 +1,74 @@
 import os
 import json
 import datetime
+import threading
+import time
+from dataclasses import dataclass, field
 import streamlit as st
-from utils.db_connector import get_db_connection, initialize_database
+from utils.db_connector import db_connection, initialize_database, test_database_connection
 
 # Fallback to file-based storage if database connection fails
 DATA_DIR = "patient_data"
 
-# Initialize database on module load
+# Storage backend is chosen once per process and shared by every session;
+# after a failed database probe, file storage is used until the next retry
 db_initialized = False
+_init_done = False
+_init_lock = threading.Lock()
+_init_retry_at = 0.0
+
+# Seconds to wait before probing the database again after a failed probe
+DB_INIT_RETRY_SECONDS = 30
+
+# Bumped on every patient write so callers can key caches on it
+_patients_version = 0
+
+# Select-list expression keeping only the top-level data keys passed as an array parameter
+_PROJECTED_DATA = "(SELECT coalesce(jsonb_object_agg(key, value), '{}'::jsonb) FROM jsonb_each(data) WHERE key = ANY(%s))"
+
+class PatientNotFoundError(LookupError):
+    """Raised when a write targets a patient that does not exist"""
+
+@dataclass
+class DashboardSummary:
+    """Patient counts and recently updated patients for the home page"""
+    total: int = 0
+    referrals_needed: int = 0
+    completed: int = 0
+    recent: list = field(default_factory=list)
+
+def ensure_db_initialized(retry=False):
+    """Initialize PostgreSQL once per process, using file storage (and probing again later) while it is unavailable"""
+    global db_initialized, _init_done, _init_retry_at
+    if _init_done or (not retry and time.monotonic() < _init_retry_at):
+        return db_initialized
+    
+    with _init_lock:
+        if not _init_done and (retry or time.monotonic() >= _init_retry_at):
+            connection_ok, _ = test_database_connection()
+            db_initialized = initialize_database() if connection_ok else False
+            
+            if db_initialized:
+                _init_done = True
+            else:
+                if not os.path.exists(DATA_DIR):
+                    os.makedirs(DATA_DIR)
+                _init_retry_at = time.monotonic() + DB_INIT_RETRY_SECONDS
+    
+    return db_initialized
 
 def use_database():
     """Check if we should use the database or file-based storage"""
-    # Get or initialize the db_initialized state
-    if 'db_initialized' not in st.session_state:
-        st.session_state.db_initialized = initialize_database()
-    
-    return st.session_state.db_initialized
+    return ensure_db_initialized()
+
+def get_patients_version():
+    """Get a counter that changes whenever patient data is written"""
+    return _patients_version
+
+def _bump_patients_version():
+    """Invalidate caches keyed on get_patients_version()"""
+    global _patients_version
+    _patients_version += 1
 
 def initialize_db():
     """Initialize the database"""
@@ -33,8 +85,7 @@ def save_patient(patient_id, patient_data):
     """Save patient data to database or file"""
     if use_database():
         try:
-            conn = get_db_connection()
-            if conn:
+            with db_connection() as conn:
                 with conn.cursor() as cur:
                     # Convert Python dict to JSON string
                     patient_data_json = json.dumps(patient_data)
@@ -58,65 +109,163 @@ def save_patient(patient_id, patient_data):
                     
                     # Commit the transaction
                     conn.commit()
-                    conn.close()
+                    _bump_patients_version()
                     return patient_id
         except Exception as e:
             st.error(f"Error saving patient to database: {e}")
-            # Fall back to file-based storage
+            return None
     
-    # Fallback to file storage if database failed or not available
+    # File storage when the database is not available
     initialize_db()
     file_path = os.path.join(DATA_DIR, f"{patient_id}.json")
     
     with open(file_path, 'w') as f:
         json.dump(patient_data, f, indent=2)
     
+    _bump_patients_version()
+    return patient_id
+
+def patch_patient(patient_id, delta):
+    """Merge the given fields into an existing patient's data without reading it first"""
+    if use_database():
+        try:
+            with db_connection() as conn:
+                with conn.cursor() as cur:
+                    # Top-level JSONB merge; keys in delta replace the stored ones
+                    cur.execute(
+                        "UPDATE patients SET data = data || %s::jsonb, updated_at = NOW() WHERE id = %s RETURNING id",
+                        (json.dumps(delta), patient_id)
+                    )
+                    result = cur.fetchone()
+                    conn.commit()
+                    
+                    if result:
+                        _bump_patients_version()
+                        return patient_id
+                    return None
+        except Exception as e:
+            st.error(f"Error updating patient in database: {e}")
+            return None
+    
+    # File storage when the database is not available
+    file_path = os.path.join(DATA_DIR, f"{patient_id}.json")
+    
+    if not os.path.exists(file_path):
+        return None
+    
+    with open(file_path, 'r') as f:
+        patient_data = json.load(f)
+    
+    patient_data.update(delta)
+    
+    with open(file_path, 'w') as f:
+        json.dump(patient_data, f, indent=2)
+    
+    _bump_patients_version()
     return patient_id
 
-def get_patient(patient_id):
-    """Get patient data from database or file"""
+def save_referral_and_patient(referral, delta):
+    """Insert a referral and merge the given fields into its patient's data in one transaction"""
+    # Returns the referral ID, or None on a (reported) database error; a missing patient raises
+    try:
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO referrals 
+                    (patient_id, consultant_id, psychiatrist_id, reason, notes, status, appointment_date)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (
+                    referral['patient_id'],
+                    referral.get('consultant_id'),
+                    referral.get('psychiatrist_id'),
+                    referral['reason'],
+                    referral.get('notes', ''),
+                    referral.get('status', 'pending'),
+                    referral.get('appointment_date')
+                ))
+                referral_id = cur.fetchone()[0]
+                
+                cur.execute(
+                    "UPDATE patients SET data = data || %s::jsonb, updated_at = NOW() WHERE id = %s RETURNING id",
+                    (json.dumps({**delta, 'database_referral_id': referral_id}), referral['patient_id'])
+                )
+                if cur.fetchone() is None:
+                    # No such patient; leave no orphan referral behind
+                    conn.rollback()
+                    raise PatientNotFoundError(referral['patient_id'])
+                
+                conn.commit()
+                _bump_patients_version()
+                return referral_id
+    except PatientNotFoundError:
+        raise
+    except Exception as e:
+        st.error(f"Error creating referral: {e}")
+    return None
+
+def get_patient(patient_id, fields=None):
+    """Get patient data (optionally only the given fields) from database or file"""
     if use_database():
         try:
-            conn = get_db_connection()
-            if conn:
+            with db_connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute("SELECT data FROM patients WHERE id = %s", (patient_id,))
+                    if fields:
+                        # Project in the database so unused fields are never sent or decoded
+                        cur.execute(f"SELECT {_PROJECTED_DATA} FROM patients WHERE id = %s", (list(fields), patient_id))
+                    else:
+                        cur.execute("SELECT data FROM patients WHERE id = %s", (patient_id,))
                     result = cur.fetchone()
-                    conn.close()
                     
                     if result:
-                        return json.loads(result[0])
+                        # psycopg2 already decodes the JSONB column
+                        return result[0]
                     return None
         except Exception as e:
             st.error(f"Error retrieving patient from database: {e}")
-            # Fall back to file-based storage
+            return None
     
-    # Fallback to file storage if database failed or not available
+    # File storage when the database is not available
     file_path = os.path.join(DATA_DIR, f"{patient_id}.json")
     
     if os.path.exists(file_path):
         with open(file_path, 'r') as f:
-            return json.load(f)
+            patient_data = json.load(f)
+        if fields:
+            patient_data = {k: patient_data[k] for k in fields if k in patient_data}
+        return patient_data
     
     return None
 
-def get_patients():
-    """Get all patients from the database or file system"""
+def get_patients(filters=None, fields=None):
+    """Get all patients (optionally only those whose data matches every filters item, and only the given fields) from the database or file system"""
     if use_database():
         try:
-            conn = get_db_connection()
-            if conn:
+            with db_connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute("SELECT data FROM patients ORDER BY updated_at DESC")
+                    params = []
+                    columns = "data"
+                    if fields:
+                        # Project in the database so unused fields are never sent or decoded
+                        columns = _PROJECTED_DATA
+                        params.append(list(fields))
+                    
+                    where = ""
+                    if filters:
+                        # JSONB containment is served by the GIN index on data
+                        where = " WHERE data @> %s"
+                        params.append(json.dumps(filters))
+                    
+                    cur.execute(f"SELECT {columns} FROM patients{where} ORDER BY updated_at DESC", params)
                     results = cur.fetchall()
-                    conn.close()
                     
-                    return [json.loads(row[0]) for row in results]
+                    # psycopg2 already decodes the JSONB column
+                    return [row[0] for row in results]
         except Exception as e:
             st.error(f"Error retrieving patients from database: {e}")
-            # Fall back to file-based storage
+            return []
     
-    # Fallback to file storage if database failed or not available
+    # File storage when the database is not available
     initialize_db()
     
     patients = []
@@ -128,7 +277,10 @@ def get_patients():
                 
                 with open(file_path, 'r') as f:
                     patient_data = json.load(f)
-                    patients.append(patient_data)
+                    if not filters or all(patient_data.get(k) == v for k, v in filters.items()):
+                        if fields:
+                            patient_data = {k: patient_data[k] for k in fields if k in patient_data}
+                        patients.append(patient_data)
     
     return patients
 
@@ -136,22 +288,76 @@ def delete_patient(patient_id):
     """Delete a patient from the database or file"""
     if use_database():
         try:
-            conn = get_db_connection()
-            if conn:
+            with db_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute("DELETE FROM patients WHERE id = %s", (patient_id,))
                     conn.commit()
-                    conn.close()
+                    _bump_patients_version()
                     return True
         except Exception as e:
             st.error(f"Error deleting patient from database: {e}")
-            # Fall back to file-based storage
+            return False
     
-    # Fallback to file storage if database failed or not available
+    # File storage when the database is not available
     file_path = os.path.join(DATA_DIR, f"{patient_id}.json")
     
     if os.path.exists(file_path):
         os.remove(file_path)
+        _bump_patients_version()
         return True
     
     return False
+
+def get_dashboard_summary(recent_limit=5):
+    """Get patient counts and the most recently updated patients in one pass"""
+    if use_database():
+        try:
+            with db_connection() as conn:
+                with conn.cursor() as cur:
+                    # Aggregates and the recent list share a single round trip
+                    cur.execute("""
+                        SELECT json_build_object(
+                            'total', count(*),
+                            'referrals_needed', count(*) FILTER (WHERE (data->>'referral_needed')::boolean),
+                            'completed', count(*) FILTER (WHERE (data->>'assessment_complete')::boolean),
+                            'recent', (
+                                SELECT coalesce(json_agg(r ORDER BY r.last_updated DESC), '[]'::json)
+                                FROM (
+                                    SELECT id,
+                                           coalesce(data->>'name', '') AS name,
+                                           data->'age' AS age,
+                                           coalesce(data->>'last_updated', '') AS last_updated,
+                                           coalesce((data->>'assessment_complete')::boolean, false) AS assessment_complete
+                                    FROM patients
+                                    ORDER BY coalesce(data->>'last_updated', '') DESC
+                                    LIMIT %s
+                                ) r
+                            )
+                        )
+                        FROM patients
+                    """, (recent_limit,))
+                    result = cur.fetchone()
+                    
+                    return DashboardSummary(**result[0])
+        except Exception as e:
+            st.error(f"Error retrieving dashboard summary from database: {e}")
+            return DashboardSummary()
+    
+    # File storage when the database is not available
+    patients = get_patients()
+    recent_patients = sorted(patients, key=lambda x: x.get('last_updated', ''), reverse=True)[:recent_limit]
+    
+    return DashboardSummary(
+        total=len(patients),
+        referrals_needed=sum(1 for p in patients if p.get('referral_needed', False)),
+        completed=sum(1 for p in patients if p.get('assessment_complete', False)),
+        recent=[
+            {
+                'id': p.get('id', ''),
+                'name': p.get('name', ''),
+                'age': p.get('age'),
+                'last_updated': p.get('last_updated', ''),
+                'assessment_complete': p.get('assessment_complete', False)
+            } for p in recent_patients
+        ]
+    )
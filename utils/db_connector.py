@@ -1,5 +1,12 @@
 import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+import orjson
 import psycopg2
+import psycopg2.extras
+from psycopg2 import pool
 from sqlalchemy import create_engine, text
 import streamlit as st
 
@@ -12,6 +19,20 @@ DB_PASSWORD = "AVNS_KezbHs7zMd6Y3pjxPoq"
 DB_SSL_MODE = "require"
 DB_SSL_CERT = "postgresql-cert.pem"
 
+# Decode json/jsonb columns with orjson instead of the stdlib json module
+psycopg2.extras.register_default_json(globally=True, loads=orjson.loads)
+psycopg2.extras.register_default_jsonb(globally=True, loads=orjson.loads)
+
+# Connection pool size (max should cover Streamlit's concurrent script threads)
+DB_POOL_MIN_CONN = 2
+DB_POOL_MAX_CONN = 10
+
+# Seconds to wait for a free pooled connection before giving up
+DB_POOL_TIMEOUT = 10
+
+# Pooled connections idle for longer than this are checked before reuse
+DB_POOL_CHECK_AFTER = 30
+
 # Get the absolute path to the certificate file
 current_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.dirname(current_dir)
@@ -38,6 +59,103 @@ def get_db_connection():
         st.error(f"Error connecting to database: {e}")
         return None
 
+# Created lazily so every process (e.g. each gunicorn worker) gets its own pool
+_connection_pool = None
+_connection_pool_lock = threading.Lock()
+
+# One slot per pooled connection, so borrowers wait instead of exhausting the pool
+_connection_slots = threading.BoundedSemaphore(DB_POOL_MAX_CONN)
+
+# When each pooled connection was last returned
+_last_returned = weakref.WeakKeyDictionary()
+
+# Names of the statements already PREPAREd on each pooled connection
+_prepared_statements = weakref.WeakKeyDictionary()
+
+def get_connection_pool():
+    """Get the process-wide PostgreSQL connection pool"""
+    global _connection_pool
+    if _connection_pool is None:
+        with _connection_pool_lock:
+            if _connection_pool is None:
+                _connection_pool = pool.ThreadedConnectionPool(
+                    DB_POOL_MIN_CONN,
+                    DB_POOL_MAX_CONN,
+                    host=DB_HOST,
+                    port=DB_PORT,
+                    database=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASSWORD,
+                    sslmode=DB_SSL_MODE,
+                    sslrootcert=cert_path
+                )
+    return _connection_pool
+
+def _connection_alive(conn):
+    """Check a pooled connection before handing it out, with a round trip only if it sat idle"""
+    if conn.closed:
+        return False
+    returned = _last_returned.get(conn)
+    if returned is None or time.monotonic() - returned < DB_POOL_CHECK_AFTER:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+def get_pooled_connection():
+    """Borrow a live connection from the pool, waiting up to DB_POOL_TIMEOUT seconds for a free one"""
+    if not _connection_slots.acquire(timeout=DB_POOL_TIMEOUT):
+        raise pool.PoolError("Timed out waiting for a free database connection")
+    
+    try:
+        connection_pool = get_connection_pool()
+        # Dead connections are discarded; the pool opens a new one in their place
+        for _ in range(DB_POOL_MAX_CONN + 1):
+            conn = connection_pool.getconn()
+            if _connection_alive(conn):
+                return conn
+            connection_pool.putconn(conn, close=True)
+        raise pool.PoolError("Could not get a working database connection")
+    except Exception:
+        _connection_slots.release()
+        raise
+
+def put_db_connection(conn):
+    """Return a borrowed connection to the pool"""
+    _last_returned[conn] = time.monotonic()
+    try:
+        get_connection_pool().putconn(conn)
+    finally:
+        _connection_slots.release()
+
+@contextmanager
+def db_connection():
+    """Borrow a pooled connection for the duration of a with block; raises if none can be had"""
+    conn = get_pooled_connection()
+    try:
+        yield conn
+    finally:
+        put_db_connection(conn)
+
+def prepare_statements(conn, statements):
+    """PREPARE the given {name: sql} statements on a pooled connection unless already done"""
+    prepared = _prepared_statements.setdefault(conn, set())
+    missing = {name: sql for name, sql in statements.items() if name not in prepared}
+    if missing:
+        with conn.cursor() as cur:
+            for name, sql in missing.items():
+                cur.execute(f"PREPARE {name} AS {sql}")
+        conn.commit()
+        prepared.update(missing)
+
+def to_jsonb(value):
+    """Adapt a Python object for a JSONB parameter, serialized with orjson"""
+    return psycopg2.extras.Json(value, dumps=lambda obj: orjson.dumps(obj).decode())
+
 def get_db_engine():
     """Get SQLAlchemy engine for database operations"""
     try:
@@ -85,6 +203,12 @@ def initialize_database():
                 CREATE INDEX IF NOT EXISTS idx_patients_id ON patients(id)
             """)
             
+            # Containment index for get_patients(filters=...) on the progress flags
+            # (look_complete, listen_complete, assessment_step, ...)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_patients_data ON patients USING GIN (data jsonb_path_ops)
+            """)
+            
             cur.execute("""
                 DROP TRIGGER IF EXISTS update_patients_updated_at ON patients;
             """)
@@ -196,6 +320,21 @@ def initialize_database():
                 EXECUTE FUNCTION update_updated_at_column();
             """)
             
+            # Rename earlier duplicate imports so the unique name index can be built
+            cur.execute("""
+                UPDATE listening_templates t
+                SET name = left(t.name, 90) || ' (#' || t.id || ')'
+                WHERE EXISTS (
+                    SELECT 1 FROM listening_templates o
+                    WHERE o.name = t.name AND o.id < t.id
+                )
+            """)
+            
+            cur.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_listening_templates_name
+                ON listening_templates(name)
+            """)
+            
             # 6. REFERRALS TABLE
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS referrals (
@@ -211,7 +350,20 @@ def initialize_database():
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
-            
+
+            # A patient's referral history, newest first, without scanning or sorting the table
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_referrals_patient_created ON referrals(patient_id, created_at DESC)
+            """)
+
+            # Referral counts checked before deleting a consultant or psychiatrist
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_referrals_consultant ON referrals(consultant_id)
+            """)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_referrals_psychiatrist ON referrals(psychiatrist_id)
+            """)
+
             cur.execute("""
                 DROP TRIGGER IF EXISTS update_referrals_updated_at ON referrals;
             """)
@@ -236,20 +388,14 @@ def initialize_database():
 
 def test_database_connection():
     """Test the database connection and return status"""
-    conn = get_db_connection()
-    if conn is None:
-        return False, "Failed to connect to the database"
-    
     try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT version()")
-            version = cur.fetchone()
-            if version and len(version) > 0:
-                return True, f"Successfully connected to PostgreSQL: {version[0]}"
-            else:
-                return True, "Successfully connected to PostgreSQL"
+        with db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT version()")
+                version = cur.fetchone()
+                if version and len(version) > 0:
+                    return True, f"Successfully connected to PostgreSQL: {version[0]}"
+                else:
+                    return True, "Successfully connected to PostgreSQL"
     except Exception as e:
-        return False, f"Error testing database: {e}"
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
+        return False, f"Error testing database: {e}"
\ No newline at end of file
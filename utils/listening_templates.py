@@ -0,0 +1,250 @@
+"""Default listening templates offered by the Listening Module import"""
+
+# Standard PFA Listening Template
+PFA_LISTENING_TEMPLATE = {
+    'name': 'Standard PFA Listening Session',
+    'description': 'A structured approach to psychological first aid listening sessions based on WHO guidelines.',
+    'questions': [
+        {
+            'category': 'Presenting Problems',
+            'question': 'What brings you here today?',
+            'type': 'text',
+            'required': True
+        },
+        {
+            'category': 'Presenting Problems',
+            'question': 'When did you first notice these concerns?',
+            'type': 'text',
+            'required': False
+        },
+        {
+            'category': 'Narrative',
+            'question': 'Can you tell me more about your experience?',
+            'type': 'textarea',
+            'required': True
+        },
+        {
+            'category': 'Emotional State',
+            'question': 'What emotions are you experiencing now?',
+            'type': 'select',
+            'options': [
+                'Sadness', 'Anxiety', 'Fear', 'Anger', 'Helplessness', 
+                'Hopelessness', 'Guilt', 'Shame', 'Numbness', 'Other'
+            ],
+            'required': True
+        },
+        {
+            'category': 'Emotional State',
+            'question': 'How intense are these emotions (1-10 scale)?',
+            'type': 'slider',
+            'min': 1,
+            'max': 10,
+            'required': True
+        },
+        {
+            'category': 'Support Systems',
+            'question': 'Who do you have for support in your life?',
+            'type': 'text',
+            'required': False
+        },
+        {
+            'category': 'Coping Strategies',
+            'question': 'What has helped you cope with difficulties in the past?',
+            'type': 'text',
+            'required': False
+        },
+        {
+            'category': 'Risk Assessment',
+            'question': 'Have you had thoughts about harming yourself?',
+            'type': 'select',
+            'options': [
+                'No suicidal thoughts', 
+                'Passive ideation', 
+                'Active ideation without plan', 
+                'Active ideation with plan', 
+                'Recent attempt'
+            ],
+            'required': True
+        },
+        {
+            'category': 'Risk Assessment',
+            'question': 'Have you had thoughts about harming others?',
+            'type': 'select',
+            'options': ['None', 'Low', 'Moderate', 'High'],
+            'required': True
+        }
+    ],
+    'guidelines': """
+    # Listening Session Guidelines
+    
+    ## Principles of PFA Listening
+    
+    1. **Create a safe space** - Find a quiet, private location for the conversation
+    2. **Be present and attentive** - Give your full attention to the person
+    3. **Use active listening** - Reflect back what you hear, ask clarifying questions
+    4. **Avoid judgment** - Be accepting and non-judgmental
+    5. **Respect confidentiality** - Ensure privacy except when safety is at risk
+    
+    ## Key Techniques
+    
+    - Maintain appropriate eye contact
+    - Use open body language
+    - Allow silences
+    - Validate feelings and experiences
+    - Use open-ended questions
+    - Avoid giving advice or false reassurance
+    - Watch for signs of distress during the conversation
+    
+    ## Risk Assessment
+    
+    If the person indicates thoughts of suicide or harm to others:
+    
+    - Ask direct questions about plans and intentions
+    - Assess if they have means to carry out the plan
+    - Determine if there is imminent danger
+    - Contact emergency services if necessary
+    - Never leave a high-risk individual alone
+    
+    ## Closing the Session
+    
+    - Summarize key points from the conversation
+    - Identify next steps and resources
+    - Schedule follow-up if appropriate
+    - Provide emergency contact information
+    """
+}
+
+# Youth-focused Listening Template
+YOUTH_LISTENING_TEMPLATE = {
+    'name': 'Youth-Focused Listening Session',
+    'description': 'A tailored approach for conducting psychological first aid listening sessions with adolescents and young adults.',
+    'questions': [
+        {
+            'category': 'Presenting Problems',
+            'question': 'What\'s been going on that brought you here today?',
+            'type': 'text',
+            'required': True
+        },
+        {
+            'category': 'School/Work',
+            'question': 'How have things been going at school/work?',
+            'type': 'text',
+            'required': False
+        },
+        {
+            'category': 'Relationships',
+            'question': 'How are things with your friends and family?',
+            'type': 'text',
+            'required': False
+        },
+        {
+            'category': 'Narrative',
+            'question': 'Can you tell me more about what\'s been happening?',
+            'type': 'textarea',
+            'required': True
+        },
+        {
+            'category': 'Emotional State',
+            'question': 'What feelings have you been having lately?',
+            'type': 'select',
+            'options': [
+                'Sadness', 'Worry', 'Fear', 'Anger', 'Overwhelmed', 
+                'Hopelessness', 'Embarrassment', 'Loneliness', 'Numbness', 'Other'
+            ],
+            'required': True
+        },
+        {
+            'category': 'Emotional State',
+            'question': 'On a scale of 1-10, how strong are these feelings?',
+            'type': 'slider',
+            'min': 1,
+            'max': 10,
+            'required': True
+        },
+        {
+            'category': 'Support Systems',
+            'question': 'Who do you talk to when you\'re having a hard time?',
+            'type': 'text',
+            'required': False
+        },
+        {
+            'category': 'Coping Strategies',
+            'question': 'What do you do to feel better when you\'re upset?',
+            'type': 'text',
+            'required': False
+        },
+        {
+            'category': 'Online/Social Media',
+            'question': 'How do you use social media or online platforms?',
+            'type': 'text',
+            'required': False
+        },
+        {
+            'category': 'Risk Assessment',
+            'question': 'Have you had thoughts about hurting yourself?',
+            'type': 'select',
+            'options': [
+                'No thoughts of self-harm', 
+                'Occasional thoughts without plan', 
+                'Frequent thoughts without plan', 
+                'Thoughts with plan', 
+                'Recent self-harm'
+            ],
+            'required': True
+        },
+        {
+            'category': 'Risk Assessment',
+            'question': 'Have you had thoughts about hurting others?',
+            'type': 'select',
+            'options': ['None', 'Low', 'Moderate', 'High'],
+            'required': True
+        },
+        {
+            'category': 'Safety',
+            'question': 'Do you feel safe at home and school?',
+            'type': 'select',
+            'options': ['Always safe', 'Usually safe', 'Sometimes unsafe', 'Often unsafe'],
+            'required': True
+        }
+    ],
+    'guidelines': """
+    # Youth-Focused Listening Guidelines
+    
+    ## Special Considerations for Youth
+    
+    1. **Use age-appropriate language** - Adjust your vocabulary to match the youth's developmental level
+    2. **Consider confidentiality limits** - Clearly explain when information must be shared (safety concerns)
+    3. **Be authentic** - Youth can detect insincerity quickly
+    4. **Allow autonomy** - Give choices when possible to help them feel empowered
+    5. **Limit distractions** - Create an environment conducive to conversation
+    
+    ## Engagement Techniques
+    
+    - Start with less sensitive topics to build rapport
+    - Use their language and terminology when appropriate
+    - Show genuine curiosity about their experiences
+    - Acknowledge their expertise about their own life
+    - Normalize their experiences when appropriate
+    - Validate their feelings without minimizing them
+    
+    ## Risk Assessment for Youth
+    
+    When assessing risk:
+    
+    - Watch for warning signs of suicide risk (withdrawal, giving away possessions, etc.)
+    - Be direct when asking about self-harm or suicidal thoughts
+    - Assess for bullying, abuse, or other safety concerns
+    - Consider online safety and cyberbullying
+    - Involve parents/guardians when appropriate for safety
+    
+    ## Closing the Session
+    
+    - Summarize strengths and resources you've identified
+    - Discuss specific next steps
+    - Provide resources that are youth-friendly
+    - Explain what will happen next in concrete terms
+    - End on a note of hope and capability
+    """
+}
+
+DEFAULT_LISTENING_TEMPLATES = (PFA_LISTENING_TEMPLATE, YOUTH_LISTENING_TEMPLATE)
@@ -54,31 +54,97 @@ def calculate_srq20_score(answers):
     # Count 'Yes' responses (True values)
     return sum(1 for key, value in answers.items() if value and key.startswith("srq_") and int(key.split("_")[1]) <= 20)
 
+# SRQ-20 distress cut-offs: a score at or above the n-th threshold is SRQ20_DISTRESS_LABELS[n + 1]
+SRQ20_DISTRESS_LABELS = (
+    "No significant mental distress",
+    "Mild mental distress",
+    "Moderate mental distress",
+    "Severe mental distress"
+)
+SRQ20_DISTRESS_THRESH = (5, 8, 11)
+
+# SRQ-29 subscales and the question numbers they count
+SRQ29_SUBSCALES = {
+    "anxiety_depression": range(1, 21),
+    "psychotic": range(21, 25),
+    "epileptic": range(25, 26),
+    "alcohol": range(26, 30)
+}
+
 def calculate_srq29_score(answers):
     """Calculate SRQ-29 score from answers"""
     # Count 'Yes' responses (True values)
-    return sum(1 for key, value in answers.items() if value)
+    return sum(map(bool, answers.values()))
+
+# Chart labels, maximum scores and form tabs of the SRQ-29 subscales, in SRQ29_SUBSCALES order
+SRQ29_CATEGORIES = ("Anxiety & Depression", "Psychotic", "Epileptic", "Alcohol")
+SRQ29_MAX_SCORES = tuple(len(questions) for questions in SRQ29_SUBSCALES.values())
+SRQ29_TABS = ("Anxiety & Depression (1-20)", "Psychotic Symptoms (21-24)", "Epilepsy (25)", "Alcohol Use (26-29)")
+
+# Bit mask of each SRQ-29 subscale's questions, for answers packed by srq_bits()
+SRQ29_SUBSCALE_MASKS = {
+    name: sum(1 << (i - 1) for i in questions)
+    for name, questions in SRQ29_SUBSCALES.items()
+}
+
+def srq_bits(answers):
+    """Pack SRQ answers into one int; bit i - 1 is set when question i was answered 'Yes'"""
+    return sum(1 << (i - 1) for i in range(1, 30) if answers.get(f"srq_{i}", False))
+
+def srq_answer_flags(bits, count):
+    """Unpack srq_bits() into a list of 'Yes' flags for questions 1 to count"""
+    return [bool(bits >> i & 1) for i in range(count)]
+
+def srq29_subscale_scores_from_bits(bits):
+    """Get subscale scores for SRQ-29 from answers packed by srq_bits()"""
+    return {name: (bits & mask).bit_count() for name, mask in SRQ29_SUBSCALE_MASKS.items()}
 
 def get_srq29_subscale_scores(answers):
     """Get subscale scores for SRQ-29"""
-    # Anxiety/depression (1-20)
-    anxiety_depression = sum(1 for key, value in answers.items() if value and key.startswith("srq_") and 1 <= int(key.split("_")[1]) <= 20)
-    
-    # Psychotic symptoms (21-24)
-    psychotic = sum(1 for key, value in answers.items() if value and key.startswith("srq_") and 21 <= int(key.split("_")[1]) <= 24)
-    
-    # Epileptic seizures (25)
-    epileptic = 1 if answers.get("srq_25", False) else 0
-    
-    # Alcohol use (26-29)
-    alcohol = sum(1 for key, value in answers.items() if value and key.startswith("srq_") and 26 <= int(key.split("_")[1]) <= 29)
-    
-    return {
-        "anxiety_depression": anxiety_depression,
-        "psychotic": psychotic,
-        "epileptic": epileptic,
-        "alcohol": alcohol
-    }
+    return srq29_subscale_scores_from_bits(srq_bits(answers))
+
+# SRQ-29 subscale score from which it calls for referral, with the guidance shown
+SRQ29_REFERRAL_CUTOFFS = {
+    "anxiety_depression": 8,
+    "psychotic": 1,
+    "epileptic": 1,
+    "alcohol": 2
+}
+SRQ29_REFERRAL_MESSAGES = {
+    "anxiety_depression": "⚕️ Anxiety & Depression: Refer to mental health professional",
+    "psychotic": "⚕️ Psychotic Symptoms: Refer to psychiatrist for specialized assessment",
+    "epileptic": "⚕️ Epileptic Seizures: Refer to neurologist or general physician",
+    "alcohol": "⚕️ Alcohol Issues: Refer to addiction specialist or counselor"
+}
+
+def srq29_referral(subscale_scores):
+    """Return whether SRQ-29 subscale scores call for referral, and the subscales that do"""
+    reasons = [name for name, cutoff in SRQ29_REFERRAL_CUTOFFS.items() if subscale_scores[name] >= cutoff]
+    return bool(reasons), reasons
+
+# Screening tools offered on the Screening Tools page
+SCREENING_TOOLS = ("SRQ-20", "SRQ-29 WHO", "DASS-42")
+
+# DASS-42 answer labels, indexed by the numeric answer value
+DASS_LABELS = (
+    "0 - Did not apply to me at all",
+    "1 - Applied to me to some degree",
+    "2 - Applied to me to a considerable degree",
+    "3 - Applied to me very much"
+)
+DASS_OPTIONS = tuple(range(len(DASS_LABELS)))
+
+# DASS-42 questions shown per form page
+DASS_PAGE_SIZE = 10
+
+# DASS-42 severity cut-offs: a score at or above the n-th threshold is SEVERITY_LABELS[n + 1]
+SEVERITY_LABELS = ("Normal", "Mild", "Moderate", "Severe", "Extremely Severe")
+DEPRESSION_THRESH = (10, 14, 21, 28)
+ANXIETY_THRESH = (8, 10, 15, 20)
+STRESS_THRESH = (15, 19, 26, 34)
+
+# Severities from which a DASS-42 scale calls for referral
+HIGH_RISK_SEVERITIES = frozenset({"Moderate", "Severe", "Extremely Severe"})
 
 def get_dass42_questions():
     """Get DASS-42 questions with their categories (depression, anxiety, stress)"""
@@ -132,30 +198,22 @@ def get_dass42_questions():
         ("Stress", "I found myself getting impatient when I was delayed in any way")
     ]
 
+# DASS-42 scales and the question numbers they count (14 per scale)
+DASS42_SCALES = {
+    "depression": range(1, 15),
+    "anxiety": range(15, 29),
+    "stress": range(29, 43)
+}
+
+# Chart labels of the DASS-42 scales, in DASS42_SCALES order
+DASS42_CATEGORIES = ("Depression", "Anxiety", "Stress")
+
 def calculate_dass42_scores(answers):
     """Calculate DASS-42 scores for depression, anxiety, and stress"""
-    depression_score = 0
-    anxiety_score = 0
-    stress_score = 0
-    
-    # Categorize questions by their index positions
-    # DASS-42 has 14 questions for each scale
-    depression_indices = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]
-    anxiety_indices = [14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27]
-    stress_indices = [28, 29, 30, 31, 32, 33, 34, 35, 36, 37, 38, 39, 40, 41]
-    
-    for i in range(1, 43):
-        key = f"dass_{i}"
-        score = answers.get(key, 0)
-        
-        # Adjust index to be 0-based for our lists
-        idx = i - 1
-        
-        if idx in depression_indices:
-            depression_score += score
-        elif idx in anxiety_indices:
-            anxiety_score += score
-        elif idx in stress_indices:
-            stress_score += score
+    # Sum each scale's questions directly instead of searching index lists per answer
+    depression_score, anxiety_score, stress_score = (
+        sum(answers.get(f"dass_{i}", 0) for i in questions)
+        for questions in DASS42_SCALES.values()
+    )
     
     return depression_score, anxiety_score, stress_score
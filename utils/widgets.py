@@ -0,0 +1,34 @@
+import streamlit as st
+from utils.constants import PATIENT_PICKER_LIMIT
+
+@st.fragment
+def patient_picker(patients, new_patient_label=None, on_change=None):
+    """Sidebar patient selector; reruns on its own and only reruns the page when the selection changes"""
+    # new_patient_label adds an option (None) for a new patient; on_change runs before the page reruns
+    if new_patient_label and not patients:
+        st.info("No existing patients found.")
+    
+    # Search by name or ID; only send the first matches to the browser
+    query = st.text_input("Search patients", key="patient_search").strip().lower()
+    matches = [
+        p for p in patients
+        if query in (p.get('name') or '').lower() or query in str(p['id']).lower()
+    ][:PATIENT_PICKER_LIMIT]
+    if not matches and not new_patient_label:
+        st.info("No matching patients.")
+        return
+    
+    # Options are patient IDs (None for a new patient); labels come from format_func
+    name_by_id = {p['id']: p.get('name') or '' for p in matches}
+    options = ([None] if new_patient_label else []) + list(name_by_id)
+    patient_id = st.selectbox(
+        "Select a patient",
+        options=options,
+        format_func=lambda pid: new_patient_label if pid is None else f"{name_by_id[pid]} (ID: {pid})"
+    )
+    
+    if patient_id != st.session_state.current_patient_id:
+        st.session_state.current_patient_id = patient_id
+        if on_change:
+            on_change()
+        st.rerun()